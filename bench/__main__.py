@@ -0,0 +1,67 @@
+"""
+Benchmarks of the primitives and the attacks.
+
+Usage:
+
+    python -m bench [--quick] [--output results.json] [--compare baseline.json]
+
+With `--compare`, results are compared with a saved baseline and the exit status is 1 if
+any of them regressed (see `--threshold`): attacks on their number of oracle calls and
+primitives on their time. See also `python -m bench.xor` for the XOR primitives compared
+to their byte-by-byte implementation.
+"""
+
+import argparse
+import itertools
+import sys
+from pathlib import Path
+
+import bench.attacks
+import bench.primitives
+from bench.harness import compare, format_comparison, format_result, load, save
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    parser.add_argument("--quick", action="store_true", help="only use small inputs")
+    parser.add_argument("--output", type=Path, help="save results to a JSON file")
+    parser.add_argument("--compare", type=Path, help="compare with results saved before")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="slowdown or extra calls considered a regression (default: 0.2 for 20%%)",
+    )
+    args = parser.parse_args()
+
+    if args.quick:
+        primitives = bench.primitives.run(sizes=(16, 1024), crack_sizes=(256,))
+        attacks = bench.attacks.run(block_counts=(1,), secret_lengths=(16,))
+    else:
+        primitives = bench.primitives.run()
+        attacks = bench.attacks.run()
+
+    baseline = {result.key: result for result in load(args.compare)} if args.compare else {}
+    results = []
+    regressions = 0
+
+    for result in itertools.chain(primitives, attacks):
+        results.append(result)
+        if result.key in baseline:
+            (comparison,) = compare([baseline[result.key]], [result])
+            regressions += comparison.is_regression(args.threshold)
+            print(format_comparison(comparison, threshold=args.threshold), flush=True)
+        else:
+            print(format_result(result), flush=True)
+
+    if args.output:
+        save(results, args.output)
+
+    if regressions:
+        print(f"{regressions} regression(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Wall time and oracle calls of the attacks.
+"""
+
+import os
+import random
+from typing import Iterator, Sequence
+
+import cryptopals.aes
+import cryptopals.cbc
+import cryptopals.ecb
+import cryptopals.padding_oracle
+import cryptopals.pkcs7
+import cryptopals.util
+from bench.harness import Result, measure_attack
+from bench.primitives import english
+
+BLOCK_COUNTS = (1, 4, 16)
+SECRET_LENGTHS = (16, 138)
+
+
+class SequentialOracle:
+    """
+    Padding oracle without `check_many`, so that `cbc.crack` sends one probe at a time.
+    """
+
+    def __init__(self, oracle: cryptopals.padding_oracle.PaddingOracle) -> None:
+        self.oracle = oracle
+
+    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        return self.oracle.check(iv=iv, ciphertext=ciphertext)
+
+
+def make_ecb_oracle(prefix: bytes, secret: bytes) -> cryptopals.ecb.Oracle:
+    key = os.urandom(16)
+
+    def oracle(input_: bytes) -> bytes:
+        plaintext = cryptopals.pkcs7.pad(prefix + input_ + secret, block_length=16)
+        return cryptopals.aes.encrypt_ecb(key=key, plaintext=plaintext)
+
+    return oracle
+
+
+def make_random_prefix_oracle(secret: bytes) -> cryptopals.ecb.Oracle:
+    key = os.urandom(16)
+    # Seeded so that the prefixes, and thus the number of calls, are the same for every run.
+    rng = random.Random(0)
+
+    def oracle(input_: bytes) -> bytes:
+        prefix = rng.randbytes(rng.randrange(64))
+        plaintext = cryptopals.pkcs7.pad(prefix + input_ + secret, block_length=16)
+        return cryptopals.aes.encrypt_ecb(key=key, plaintext=plaintext)
+
+    return oracle
+
+
+def crack_cbc(block_count: int, batch: bool) -> int:
+    # Seeded so that the number of calls is the same for every run.
+    rng = random.Random(block_count)
+    key = rng.randbytes(16)
+    iv = rng.randbytes(16)
+    plaintext = cryptopals.pkcs7.pad(english(16 * block_count - 1), block_length=16)
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = cryptopals.padding_oracle.PaddingOracle(key=key)
+
+    result = cryptopals.cbc.crack(
+        oracle=oracle if batch else SequentialOracle(oracle),
+        params=cryptopals.cbc.Params(block_length=16, iv=iv, ciphertext=ciphertext),
+    )
+
+    assert result == plaintext
+    return oracle.stats.calls
+
+
+def find_byte(batch: bool) -> int:
+    oracle = cryptopals.ecb.CountingOracle(make_ecb_oracle(prefix=b"", secret=b"\xff"))
+    plaintext = b"A" * 15
+    target_block = cryptopals.util.nth_block(oracle(plaintext), block_length=16, number=0)
+    find = cryptopals.ecb.find_byte_batch if batch else cryptopals.ecb.find_byte
+
+    result = find(
+        oracle=oracle,
+        plaintext=plaintext,
+        target_block=target_block,
+        block_number=0,
+        block_length=16,
+    )
+
+    assert result == b"\xff"
+    return oracle.calls
+
+
+def recover_suffix(secret_length: int, prefix: bytes | None) -> int:
+    secret = english(secret_length)
+    if prefix is None:
+        oracle = make_random_prefix_oracle(secret)
+    else:
+        oracle = make_ecb_oracle(prefix=prefix, secret=secret)
+
+    result = cryptopals.ecb.recover_suffix(oracle, random_prefix=prefix is None)
+
+    assert result.suffix == secret
+    return result.calls
+
+
+def run(
+    block_counts: Sequence[int] = BLOCK_COUNTS,
+    secret_lengths: Sequence[int] = SECRET_LENGTHS,
+) -> Iterator[Result]:
+    for block_count in block_counts:
+        size = 16 * block_count
+        yield measure_attack("cbc.crack (batch)", size, lambda: crack_cbc(block_count, batch=True))
+        yield measure_attack(
+            "cbc.crack (sequential)", size, lambda: crack_cbc(block_count, batch=False)
+        )
+
+    yield measure_attack("ecb.find_byte", 1, lambda: find_byte(batch=False))
+    yield measure_attack("ecb.find_byte_batch", 1, lambda: find_byte(batch=True))
+
+    for secret_length in secret_lengths:
+        yield measure_attack(
+            "ecb.recover_suffix (challenge 12)",
+            secret_length,
+            lambda: recover_suffix(secret_length, prefix=b""),
+        )
+        yield measure_attack(
+            "ecb.recover_suffix (challenge 14)",
+            secret_length,
+            lambda: recover_suffix(secret_length, prefix=bytes(range(37))),
+        )
+        yield measure_attack(
+            "ecb.recover_suffix (random prefix)",
+            secret_length,
+            lambda: recover_suffix(secret_length, prefix=None),
+        )
@@ -0,0 +1,152 @@
+"""
+Measurements, their machine-readable format and comparison with a baseline.
+"""
+
+import json
+import platform
+import statistics
+import timeit
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+REPEAT = 7
+
+
+@dataclass(frozen=True)
+class Result:
+    """
+    Time of a function (median of several runs) and, for an attack, its number of oracle
+    calls.
+
+    `spread` is the difference between the slowest and the fastest runs, relative to
+    `seconds`. It's used as the noise of the measure when comparing with a baseline.
+    """
+
+    name: str
+    size: int
+    seconds: float
+    calls: int | None = None
+    spread: float = 0.0
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.name, self.size)
+
+
+def time_function(function: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """
+    Return the median time of a function and the spread of the times (see `Result`).
+
+    Each run calls the function enough times to last at least 0.2 seconds.
+    """
+    timer = timeit.Timer(function)
+    (number, _) = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(times)
+    return (median, (max(times) - min(times)) / median)
+
+
+def measure(name: str, size: int, function: Callable[[], object], repeat: int = REPEAT) -> Result:
+    """
+    Return the time of a fast function, repeated enough to be measured accurately.
+    """
+    (seconds, spread) = time_function(function, repeat=repeat)
+    return Result(name=name, size=size, seconds=seconds, spread=spread)
+
+
+def measure_attack(
+    name: str, size: int, function: Callable[[], int], repeat: int = REPEAT
+) -> Result:
+    """
+    Return the time of a slow function (e.g. an attack), which returns its number of oracle
+    calls.
+
+    The number of calls is only kept if it's the same for every call, so that it can be
+    compared with a baseline.
+    """
+    calls: set[int] = set()
+    (seconds, spread) = time_function(lambda: calls.add(function()), repeat=repeat)
+    return Result(
+        name=name,
+        size=size,
+        seconds=seconds,
+        calls=calls.pop() if len(calls) == 1 else None,
+        spread=spread,
+    )
+
+
+def save(results: Iterable[Result], path: Path) -> None:
+    data = {
+        "python": platform.python_version(),
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load(path: Path) -> Sequence[Result]:
+    data = json.loads(path.read_text())
+    return [Result(**result) for result in data["results"]]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    baseline: Result
+    result: Result
+
+    @property
+    def ratio(self) -> float:
+        """Time relative to the baseline (e.g. 2 for twice as slow)."""
+        return self.result.seconds / self.baseline.seconds
+
+    def is_regression(self, threshold: float) -> bool:
+        """
+        Return whether the result is worse than the baseline by more than `threshold`
+        (e.g. 0.2 for 20%).
+
+        Attacks with a deterministic number of oracle calls are compared on those calls,
+        since their time depends on the load of the machine as much as on the code. Other
+        results are compared on time, with the spread of both measures added to the
+        threshold.
+        """
+        if self.result.calls is not None and self.baseline.calls is not None:
+            return self.result.calls > self.baseline.calls * (1 + threshold)
+        noise = self.baseline.spread + self.result.spread
+        return self.ratio > 1 + threshold + noise
+
+
+def compare(baseline: Iterable[Result], results: Iterable[Result]) -> Sequence[Comparison]:
+    """Match results with the baseline (results missing from either side are ignored)."""
+    baseline_by_key = {result.key: result for result in baseline}
+    return [
+        Comparison(baseline=baseline_by_key[result.key], result=result)
+        for result in results
+        if result.key in baseline_by_key
+    ]
+
+
+def format_size(size: int) -> str:
+    for unit, factor in [("MiB", 1 << 20), ("KiB", 1 << 10)]:
+        if size >= factor and size % factor == 0:
+            return f"{size // factor} {unit}"
+    return str(size)
+
+
+def format_result(result: Result) -> str:
+    calls = "" if result.calls is None else f" {result.calls:>8} calls"
+    return (
+        f"{result.name:<36} {format_size(result.size):>9} {result.seconds * 1e3:>12.3f} ms{calls}"
+    )
+
+
+def format_comparison(comparison: Comparison, threshold: float) -> str:
+    (baseline, result) = (comparison.baseline, comparison.result)
+    calls = ""
+    if result.calls is not None and baseline.calls is not None:
+        calls = f" {baseline.calls:>8} -> {result.calls:<8} calls"
+    flag = " REGRESSION" if comparison.is_regression(threshold) else ""
+    return (
+        f"{result.name:<36} {format_size(result.size):>9}"
+        f" {baseline.seconds * 1e3:>12.3f} -> {result.seconds * 1e3:<12.3f} ms"
+        f" {comparison.ratio:>6.2f}x{calls}{flag}"
+    )
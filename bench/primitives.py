@@ -0,0 +1,80 @@
+"""
+Time of the primitives over a range of input sizes.
+"""
+
+import os
+from typing import Iterator, Sequence
+
+import cryptopals.aes
+import cryptopals.ecb
+import cryptopals.multi_byte_xor
+import cryptopals.single_byte_xor
+import cryptopals.xor
+from bench.harness import Result, measure
+
+SIZES = (16, 1024, 64 * 1024, 1024 * 1024)
+CRACK_SIZES = (256, 4 * 1024, 64 * 1024)
+
+ENGLISH = (
+    b"Rollin' in my 5.0 with my rag-top down so my hair can blow. The girlies on standby "
+    b"waving just to say hi. Did you stop? No, I just drove by. Now that the party is "
+    b"jumping, with the bass kicked in and the Vega's are pumpin'. Quick to the point, to "
+    b"the point, no faking. Cooking MC's like a pound of bacon.\n"
+)
+
+
+def english(size: int) -> bytes:
+    return (ENGLISH * (size // len(ENGLISH) + 1))[:size]
+
+
+def run(sizes: Sequence[int] = SIZES, crack_sizes: Sequence[int] = CRACK_SIZES) -> Iterator[Result]:
+    key = os.urandom(16)
+    iv = os.urandom(16)
+    nonce = os.urandom(8)
+
+    for size in sizes:
+        bytes_0 = os.urandom(size)
+        bytes_1 = os.urandom(size)
+        blocks = os.urandom(size - size % 16)
+
+        yield measure("xor.add", size, lambda: cryptopals.xor.add(bytes_0, bytes_1))
+        yield measure(
+            "aes.encrypt_cbc",
+            size,
+            lambda: cryptopals.aes.encrypt_cbc(key=key, plaintext=blocks, iv=iv),
+        )
+        yield measure(
+            "aes.decrypt_cbc",
+            size,
+            lambda: cryptopals.aes.decrypt_cbc(key=key, ciphertext=blocks, iv=iv),
+        )
+        yield measure(
+            "aes.encrypt_ctr",
+            size,
+            lambda: cryptopals.aes.encrypt_ctr(key=key, plaintext=bytes_0, nonce=nonce),
+        )
+        yield measure(
+            "multi_byte_xor.hamming_distance",
+            size,
+            lambda: cryptopals.multi_byte_xor.hamming_distance(bytes_0, bytes_1),
+        )
+        yield measure(
+            "ecb.detect",
+            size,
+            lambda: cryptopals.ecb.detect(blocks, block_length=16),
+        )
+
+    for size in crack_sizes:
+        single_byte = cryptopals.xor.encrypt(english(size), key=b"\x42")
+        multi_byte = cryptopals.xor.encrypt(english(size), key=b"Terminator X")
+
+        yield measure(
+            "single_byte_xor.crack",
+            size,
+            lambda: cryptopals.single_byte_xor.crack(single_byte),
+        )
+        yield measure(
+            "multi_byte_xor.crack",
+            size,
+            lambda: cryptopals.multi_byte_xor.crack(multi_byte, key_lengths=range(2, 40)),
+        )
@@ -0,0 +1,42 @@
+"""
+Throughput of the XOR primitives, compared to the byte-by-byte implementation.
+
+Usage: `python -m bench.xor`
+"""
+
+import os
+import timeit
+from typing import Callable
+
+import cryptopals.xor
+
+SIZES = (16, 1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024)
+
+
+def throughput(function: Callable[[], object], size: int) -> float:
+    """Return the throughput of a function in MB/s."""
+    timer = timeit.Timer(function)
+    (number, _) = timer.autorange()
+    best = min(timer.repeat(repeat=3, number=number)) / number
+    return size / best / 1e6
+
+
+def main() -> None:
+    print(f"{'function':<10} {'size':>10} {'iterable (MB/s)':>16} {'buffers (MB/s)':>16}")
+
+    for size in SIZES:
+        bytes_0 = os.urandom(size)
+        bytes_1 = os.urandom(size)
+        key = os.urandom(16)
+
+        iterable = throughput(lambda: cryptopals.xor.add_iterable(bytes_0, bytes_1), size)
+        buffers = throughput(lambda: cryptopals.xor.add(bytes_0, bytes_1), size)
+        print(f"{'add':<10} {size:>10} {iterable:>16.1f} {buffers:>16.1f}")
+
+        iterable = throughput(lambda: cryptopals.xor.encrypt_iterable(bytes_0, key), size)
+        buffers = throughput(lambda: cryptopals.xor.encrypt(bytes_0, key), size)
+        print(f"{'encrypt':<10} {size:>10} {iterable:>16.1f} {buffers:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
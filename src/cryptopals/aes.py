@@ -1,4 +1,7 @@
 import itertools
+import struct
+import threading
+from collections import OrderedDict
 from typing import Iterator
 
 from cryptography.hazmat.backends import default_backend
@@ -13,19 +16,141 @@ def ecb_cipher(key: bytes) -> Cipher[modes.ECB]:
     return Cipher(algorithms.AES(key), modes.ECB(), backend=backend)
 
 
-def encrypt_ecb(key: bytes, plaintext: bytes) -> bytes:
-    cipher = ecb_cipher(key)
-    encryptor = cipher.encryptor()
-    return encryptor.update(plaintext) + encryptor.finalize()
+class AesKey:
+    """
+    AES key with prepared ECB contexts.
 
+    ECB contexts are never finalized, so they can be used for any number of blocks
+    without paying for the key expansion and the construction of the cipher again.
+    """
 
-def decrypt_ecb(key: bytes, ciphertext: bytes) -> bytes:
-    cipher = ecb_cipher(key)
-    decryptor = cipher.decryptor()
-    return decryptor.update(ciphertext) + decryptor.finalize()
+    block_length = 16
+
+    def __init__(self, key: bytes | bytearray) -> None:
+        self.key = bytes(key)
+        cipher = ecb_cipher(self.key)
+        self._encryptor = cipher.encryptor()
+        self._decryptor = cipher.decryptor()
+        # Contexts are stateful, so they can't be used by two threads at the same time.
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"AesKey(length={len(self.key)})"
+
+    def _check_length(self, data: bytes | bytearray | memoryview) -> None:
+        # Contexts would otherwise buffer the trailing bytes until the next call.
+        if len(data) % self.block_length != 0:
+            raise ValueError("The length of the data is not a multiple of the block length.")
+
+    def encrypt_ecb(self, plaintext: bytes | bytearray | memoryview) -> bytes:
+        self._check_length(plaintext)
+        with self._lock:
+            return self._encryptor.update(plaintext)
+
+    def decrypt_ecb(self, ciphertext: bytes | bytearray | memoryview) -> bytes:
+        self._check_length(ciphertext)
+        with self._lock:
+            return self._decryptor.update(ciphertext)
+
+
+Key = bytes | AesKey
+
+
+class KeyCache:
+    """
+    Least-recently-used cache of `AesKey` objects, indexed by key bytes.
+
+    A `maxsize` of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._keys: OrderedDict[bytes, AesKey] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, key: bytes | bytearray) -> AesKey:
+        key = bytes(key)
 
+        with self._lock:
+            aes_key = self._keys.get(key)
+            if aes_key is not None:
+                self._keys.move_to_end(key)
+                return aes_key
 
-def encrypt_cbc(key: bytes, plaintext: bytes, iv: bytes) -> bytes:
+            aes_key = AesKey(key)
+            self._keys[key] = aes_key
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+            return aes_key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+key_cache = KeyCache(maxsize=128)
+
+
+def aes_key(key: Key) -> AesKey:
+    """Return a key with prepared contexts, from the cache if `key` is raw bytes."""
+    if isinstance(key, AesKey):
+        return key
+    return key_cache.get(key)
+
+
+def encrypt_ecb(key: Key, plaintext: bytes | bytearray) -> bytes:
+    return aes_key(key).encrypt_ecb(plaintext)
+
+
+def decrypt_ecb(key: Key, ciphertext: bytes | bytearray) -> bytes:
+    return aes_key(key).decrypt_ecb(ciphertext)
+
+
+def encrypt_cbc(key: Key, plaintext: bytes, iv: bytes) -> bytes:
+    block_size = 16
+    assert len(plaintext) % block_size == 0
+    assert len(iv) % block_size == 0
+
+    # CBC encryption can't be parallelized, but we can at least use the same prepared key
+    # for all the blocks and write the result in place.
+    key = aes_key(key)
+    ciphertext = bytearray(len(plaintext))
+    ciphertext_block = iv[:block_size]
+
+    for offset in range(0, len(plaintext), block_size):
+        ciphertext_block = key.encrypt_ecb(
+            cryptopals.xor.add(plaintext[offset : offset + block_size], ciphertext_block)
+        )
+        ciphertext[offset : offset + block_size] = ciphertext_block
+
+    return bytes(ciphertext)
+
+
+def decrypt_cbc(key: Key, ciphertext: bytes | bytearray, iv: bytes | bytearray) -> bytes:
+    block_size = 16
+    assert len(ciphertext) % block_size == 0
+    assert len(iv) % block_size == 0
+
+    # Each plaintext block only depends on two ciphertext blocks, so all the blocks can be
+    # decrypted at once and then XORed with the ciphertext shifted by one block:
+    #
+    #     decrypted: D0 D1 D2
+    #     shifted:   IV C0 C1
+    #     plaintext: P0 P1 P2
+    decrypted = decrypt_ecb(key=key, ciphertext=ciphertext)
+    shifted = bytes(iv[:block_size]) + ciphertext[:-block_size]
+    return cryptopals.xor.add(decrypted, shifted)
+
+
+def encrypt_cbc_reference(key: Key, plaintext: bytes, iv: bytes) -> bytes:
+    """
+    Encrypt with CBC, one block at a time.
+
+    This is slower than `encrypt_cbc` but follows the definition of CBC closely.
+    """
     block_size = 16
     assert len(plaintext) % block_size == 0
     assert len(iv) % block_size == 0
@@ -44,7 +169,12 @@ def encrypt_cbc(key: bytes, plaintext: bytes, iv: bytes) -> bytes:
     return ciphertext
 
 
-def decrypt_cbc(key: bytes, ciphertext: bytes | bytearray, iv: bytes | bytearray) -> bytes:
+def decrypt_cbc_reference(key: Key, ciphertext: bytes | bytearray, iv: bytes | bytearray) -> bytes:
+    """
+    Decrypt with CBC, one block at a time.
+
+    This is slower than `decrypt_cbc` but follows the definition of CBC closely.
+    """
     block_size = 16
     assert len(ciphertext) % block_size == 0
     assert len(iv) % block_size == 0
@@ -66,7 +196,7 @@ def decrypt_cbc(key: bytes, ciphertext: bytes | bytearray, iv: bytes | bytearray
     return plaintext
 
 
-def gen_ctr_blocks(key: bytes, nonce: bytes) -> Iterator[bytes]:
+def gen_ctr_blocks(key: Key, nonce: bytes) -> Iterator[bytes]:
     counter = 0
     while True:
         data = nonce + counter.to_bytes(8, "little")
@@ -74,19 +204,62 @@ def gen_ctr_blocks(key: bytes, nonce: bytes) -> Iterator[bytes]:
         counter += 1
 
 
-def encrypt_ctr(key: bytes, plaintext: bytes, nonce: bytes) -> bytes:
-    assert len(key) == 16
-    assert len(nonce) == 8
+counter_block = struct.Struct("<8sQ")
+
+
+class Ctr:
+    """
+    CTR mode with a keystream that can be consumed in chunks and from any offset.
+
+    The keystream is generated `batch_block_count` blocks at a time, with a single ECB call
+    over a buffer of counter blocks, so memory use doesn't depend on the length of the
+    data.
+    """
 
     block_length = 16
-    length = len(plaintext)
-    count = length // block_length
-    remainder = length % block_length
-    needed = count + 1 if remainder else count
-    ctr_blocks = itertools.islice(gen_ctr_blocks(key=key, nonce=nonce), needed)
-    ctr_stream = b"".join(ctr_blocks)
-    return cryptopals.xor.encrypt(plaintext=plaintext, key=ctr_stream)
+
+    def __init__(self, key: Key, nonce: bytes, batch_block_count: int = 256) -> None:
+        self.key = aes_key(key)
+        assert len(self.key.key) == 16
+        assert len(nonce) == 8
+        assert batch_block_count > 0
+        self.nonce = nonce
+        self.batch_block_count = batch_block_count
+        self.offset = 0
+
+    def seek(self, offset: int) -> None:
+        """Move to a byte offset in the keystream, without generating what's before."""
+        assert offset >= 0
+        self.offset = offset
+
+    def keystream_blocks(self, block_number: int, count: int) -> bytes:
+        # Each counter block is the nonce followed by the little-endian block counter.
+        counters = range(block_number, block_number + count)
+        counter_blocks = b"".join(map(counter_block.pack, itertools.repeat(self.nonce), counters))
+        return self.key.encrypt_ecb(counter_blocks)
+
+    def update(self, data: bytes | bytearray | memoryview) -> bytes:
+        """Encrypt or decrypt data at the current offset and move past it."""
+        data = memoryview(data)
+        output = bytearray(len(data))
+        position = 0
+
+        while position < len(data):
+            (block_number, skip) = divmod(self.offset, self.block_length)
+            needed = -(-(skip + len(data) - position) // self.block_length)
+            count = min(needed, self.batch_block_count)
+            keystream = memoryview(self.keystream_blocks(block_number, count))[skip:]
+            chunk = data[position : position + len(keystream)]
+            output[position : position + len(chunk)] = cryptopals.xor.add(chunk, keystream)
+            position += len(chunk)
+            self.offset += len(chunk)
+
+        return bytes(output)
+
+
+def encrypt_ctr(key: Key, plaintext: bytes, nonce: bytes) -> bytes:
+    return Ctr(key=key, nonce=nonce).update(plaintext)
 
 
-def decrypt_ctr(key: bytes, ciphertext: bytes, nonce: bytes) -> bytes:
+def decrypt_ctr(key: Key, ciphertext: bytes, nonce: bytes) -> bytes:
     return encrypt_ctr(key=key, plaintext=ciphertext, nonce=nonce)
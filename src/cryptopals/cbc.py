@@ -1,10 +1,18 @@
+import hashlib
+import itertools
+import json
 import logging
-from dataclasses import dataclass
-from typing import Self, Sequence
+import os
+import string
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Literal, Self, Sequence, overload
 
-from typing_extensions import Protocol
+from typing_extensions import Protocol, runtime_checkable
 
-from cryptopals.format import bytes_to_hex
+from cryptopals.format import bytes_to_hex, hex_to_bytes
 from cryptopals.util import nth_block, nth_block_view
 
 logger = logging.getLogger(__name__)
@@ -14,70 +22,366 @@ class Oracle(Protocol):
     def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool: ...
 
 
+Probe = tuple[bytes | bytearray, bytes | bytearray]  # IV and ciphertext.
+
+
+@runtime_checkable
+class BatchOracle(Oracle, Protocol):
+    """
+    Oracle which can also check many probes in one call.
+
+    This is used instead of `check` when available.
+    """
+
+    def check_many(self, probes: Sequence[Probe]) -> Sequence[bool]: ...
+
+
 @dataclass(frozen=True)
 class Params:
+    """
+    Parameters of the padding oracle attack.
+
+    By default, the oracle receives the original IV and the ciphertext up to the target
+    block. With `short_probes`, it only receives the two blocks needed to crack a block:
+    the previous block as IV and the target block as ciphertext. Only enable it if the
+    oracle accepts such probes (e.g. it doesn't expect a fixed IV).
+
+    Without `short_probes`, the probes of a batch (see `BatchOracle`) share the same
+    buffers, so that the ciphertext isn't copied for each of them (see `SharedProbes`).
+    """
+
     block_length: int
     iv: bytes
     ciphertext: bytes
+    short_probes: bool = False
 
     def with_ciphertext(self, ciphertext: bytes) -> "Params":
         return Params(
             block_length=self.block_length,
             iv=self.iv,
             ciphertext=ciphertext,
+            short_probes=self.short_probes,
         )
 
 
-@dataclass(frozen=True)
+@dataclass
 class CrackedBlock:
+    """
+    Plaintext of a block, cracked from right to left.
+
+    The known plaintext is stored at the end of a buffer of the length of a block, which
+    is updated in place.
+    """
+
     length: int
-    plaintext: Sequence[int]
+    buffer: bytearray
+    count: int = 0
 
     @classmethod
     def empty(cls, length: int) -> Self:
-        return cls(length=length, plaintext=[])
+        return cls(length=length, buffer=bytearray(length))
+
+    @classmethod
+    def from_plaintext(cls, length: int, plaintext: bytes) -> Self:
+        assert len(plaintext) <= length
+        buffer = bytearray(length - len(plaintext)) + plaintext
+        return cls(length=length, buffer=buffer, count=len(plaintext))
+
+    @property
+    def plaintext(self) -> memoryview:
+        return memoryview(self.buffer)[self.length - self.count :]
+
+    def add_byte(self, byte: int) -> None:
+        """Add a byte to the left of the known plaintext."""
+        assert not self.is_complete()
+        self.count += 1
+        self.buffer[-self.count] = byte
+
+    def copy(self) -> "CrackedBlock":
+        return CrackedBlock(length=self.length, buffer=self.buffer.copy(), count=self.count)
 
     def with_one_more_byte(self, byte: int) -> "CrackedBlock":
-        return CrackedBlock(length=self.length, plaintext=[byte, *self.plaintext])
+        cracked = self.copy()
+        cracked.add_byte(byte)
+        return cracked
 
     def is_complete(self) -> bool:
-        return len(self.plaintext) >= self.length
+        return self.count >= self.length
 
     def hex(self) -> str:
         return bytes_to_hex(bytes(self.plaintext))
 
 
+class Workspace:
+    """
+    Buffers sent to the oracle to crack a block, modified in place for every probe.
+
+    `block` is a view of the bytes to modify: the IV or the block before the target block.
+    """
+
+    def __init__(self, params: Params, block_number: int) -> None:
+        block_length = params.block_length
+        self.block_number = block_number
+        self.iv: bytes | bytearray
+        self.ciphertext: bytes | bytearray
+
+        if block_number == 0:
+            self.iv = bytearray(params.iv[:block_length])
+            self.ciphertext = nth_block(params.ciphertext, block_length, number=0)
+            self.block = memoryview(self.iv)
+        elif params.short_probes:
+            self.iv = bytearray(nth_block(params.ciphertext, block_length, block_number - 1))
+            self.ciphertext = nth_block(params.ciphertext, block_length, block_number)
+            self.block = memoryview(self.iv)
+        else:
+            self.iv = params.iv
+            self.ciphertext = bytearray(
+                nth_block(params.ciphertext, block_length, number=0, count=block_number + 1)
+            )
+            self.block = nth_block_view(self.ciphertext, block_length, number=-2)
+
+        self.original = bytes(self.block)
+        # Only probes of the original IV and the ciphertext up to the target block are too
+        # long to be copied.
+        self.shared = block_number > 0 and not params.short_probes
+
+    def probes(self, index: int, values: Sequence[int]) -> Sequence[Probe]:
+        """
+        Return the probes with each of `values` as the byte at `index` of `block`.
+
+        Short probes are copied. Others share the buffers of the workspace.
+        """
+        if self.shared:
+            return SharedProbes(self, index=index, values=values)
+
+        probes = []
+        for value in values:
+            self.block[index] = value
+            probes.append((bytes(self.iv), bytes(self.ciphertext)))
+        return probes
+
+
+class SharedProbes(Sequence[Probe]):
+    """
+    Probes which all share the buffers of a workspace, each one being set up when it's
+    accessed.
+
+    The oracle must use each probe before accessing the next one (e.g. by going through
+    them in order) and must not keep them.
+    """
+
+    def __init__(self, workspace: Workspace, index: int, values: Sequence[int]) -> None:
+        self.workspace = workspace
+        self.byte_index = index
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @overload
+    def __getitem__(self, key: int) -> Probe: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> "SharedProbes": ...
+
+    def __getitem__(self, key: int | slice) -> "Probe | SharedProbes":
+        if isinstance(key, slice):
+            return SharedProbes(self.workspace, index=self.byte_index, values=self.values[key])
+        self.workspace.block[self.byte_index] = self.values[key]
+        return (self.workspace.iv, self.workspace.ciphertext)
+
+
+class CandidateOrder(Protocol):
+    def candidates(self, cracked: CrackedBlock, last_block: bool) -> Sequence[int]:
+        """
+        Return all the possible values of the next plaintext byte, most likely first.
+        """
+        ...
+
+    def record(self, byte: int) -> None:
+        """Take into account a byte which was just cracked."""
+        ...
+
+
+ENGLISH_ORDER = (
+    b" etaoinshrdlcumwfgypbvkjxqzETAOINSHRDLCUMWFGYPBVKJXQZ0123456789.,'\"-!?;:\n"
+) + string.printable.encode()
+
+
+@dataclass
+class LikelyOrder:
+    """
+    Try the most likely plaintext bytes first.
+
+    In order: PKCS#7 padding in the last block, bytes already cracked (most frequent
+    first), printable ASCII (English letter frequency first) and then all the other bytes.
+    """
+
+    seen: Counter[int] = field(default_factory=Counter)
+
+    def candidates(self, cracked: CrackedBlock, last_block: bool) -> Sequence[int]:
+        priorities: list[Iterable[int]] = []
+
+        if last_block:
+            # The plaintext of the last block ends with `n` times the byte `n`.
+            known = set(cracked.plaintext)
+            if not known:
+                priorities.append(range(1, cracked.length + 1))
+            elif len(known) == 1 and len(cracked.plaintext) < cracked.plaintext[0]:
+                priorities.append(known)
+
+        priorities.append(byte for (byte, _) in self.seen.most_common())
+        priorities.append(ENGLISH_ORDER)
+        priorities.append(range(256))
+        return list(dict.fromkeys(itertools.chain.from_iterable(priorities)))
+
+    def record(self, byte: int) -> None:
+        self.seen[byte] += 1
+
+
+@dataclass
+class Stats:
+    """
+    Number of oracle calls, compared to the number of calls an exhaustive search in the
+    natural order (`0x00`, `0x01`, etc.) would have needed.
+    """
+
+    calls: int = 0
+    natural_calls: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.natural_calls - self.calls
+
+
+class Checkpoint:
+    """
+    Progress of an attack, saved to a JSON lines file so that it can be resumed.
+
+    The first line identifies the IV and ciphertext, and each following line is the
+    plaintext cracked so far for a block. The file is created with its first line
+    atomically, then lines are only appended. Invalid lines (e.g. truncated by a crash)
+    are ignored, and a truncated last line is terminated before appending.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], params: Params) -> None:
+        self.path = Path(path)
+        self.digest = hashlib.sha256(params.iv + params.ciphertext).hexdigest()
+        self.blocks: dict[int, CrackedBlock] = {}
+        self.needs_newline = False
+        self._load(block_length=params.block_length)
+
+    def _load(self, block_length: int) -> None:
+        if not self.path.exists():
+            return
+
+        with self.path.open() as file:
+            content = file.read()
+        (header, *lines) = content.splitlines() or [""]
+
+        # A line truncated by a crash must be terminated before anything is appended.
+        self.needs_newline = not content.endswith("\n")
+
+        # Without a valid header, the blocks can't be trusted to match the ciphertext.
+        try:
+            digest = json.loads(header).get("digest")
+        except (json.JSONDecodeError, AttributeError):
+            raise ValueError(f"Invalid checkpoint header: {self.path}")
+        if digest != self.digest:
+            raise ValueError(f"Checkpoint for another ciphertext: {self.path}")
+
+        for line_number, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+                block_number = entry["block"]
+                plaintext = hex_to_bytes(entry["plaintext"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Ignoring invalid checkpoint line: %s", line_number)
+                continue
+
+            if not isinstance(block_number, int) or len(plaintext) > block_length:
+                logger.warning("Ignoring invalid checkpoint line: %s", line_number)
+                continue
+
+            self.blocks[block_number] = CrackedBlock.from_plaintext(
+                length=block_length,
+                plaintext=plaintext,
+            )
+
+    def _create(self) -> None:
+        # The header is written to a temporary file which is then renamed, so that the
+        # checkpoint never exists without it.
+        temporary_path = self.path.with_name(f"{self.path.name}.tmp")
+        with temporary_path.open("w") as file:
+            file.write(json.dumps({"digest": self.digest}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def _append(self, entry: dict[str, object]) -> None:
+        with self.path.open("a") as file:
+            if self.needs_newline:
+                file.write("\n")
+                self.needs_newline = False
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def get(self, block_number: int, block_length: int) -> CrackedBlock:
+        """Return the plaintext cracked so far for a block (as a copy)."""
+        cracked = self.blocks.get(block_number)
+        if cracked is None:
+            return CrackedBlock.empty(length=block_length)
+        return cracked.copy()
+
+    def save(self, block_number: int, cracked: CrackedBlock) -> None:
+        if not self.path.exists():
+            self._create()
+            self.needs_newline = False
+        self._append({"block": block_number, "plaintext": cracked.hex()})
+        self.blocks[block_number] = cracked.copy()
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
 def crack_byte(
     oracle: Oracle,
     params: Params,
     cracked: CrackedBlock,
+    order: CandidateOrder | None = None,
+    stats: Stats | None = None,
+    last_block: bool = False,
+    workspace: Workspace | None = None,
 ) -> CrackedBlock:
     """
     Crack one byte of plaintext from a given block.
 
-    The target block is the last block in the ciphertext and the target byte is inferred
-    from the amount of plaintext already cracked.
+    The target block is the one of the `workspace` if provided, or else the last block in
+    the ciphertext. The target byte is inferred from the amount of plaintext already
+    cracked. `cracked` isn't modified: a copy with the new byte is returned.
+
+    Candidates are tried in the natural order unless `order` is provided. `last_block`
+    tells whether the block is the last one of the original ciphertext, which contains
+    the padding.
     """
 
-    block_number = len(params.ciphertext) // params.block_length - 1
+    if workspace is None:
+        block_number = len(params.ciphertext) // params.block_length - 1
+        workspace = Workspace(params=params, block_number=block_number)
+
     logger.debug(
         "Cracking byte (block_number: %s, plaintext (hex): %s)",
-        block_number,
+        workspace.block_number,
         cracked.hex() or "-",
     )
 
-    # Copy the IV or ciphertext to modify.
-    iv = bytearray(params.iv)
-    ciphertext = bytearray(params.ciphertext)
-
-    # If we target the first block, we must modify the IV.
-    if block_number < 1:
-        block = memoryview(iv)
-    else:
-        block = nth_block_view(data=ciphertext, block_length=params.block_length, number=-2)
+    # The IV or the previous ciphertext block, modified in place.
+    block = workspace.block
+    original = workspace.original
 
     # Byte number of the target plaintext (starting from 0, from the right).
-    byte_number = len(cracked.plaintext)
+    byte_number = cracked.count
     assert byte_number < params.block_length
 
     index = -(byte_number + 1)  # Index of the target byte (e.g. last index is `-1`).
@@ -87,46 +391,96 @@ def crack_byte(
     # For example, if we know the last two bytes, we'll want the oracle to get get
     # `0x0303` during decryption, so that we can test the third byte.
     for i, byte in zip(range(index + 1, 0), cracked.plaintext):
-        block[i] ^= byte ^ pad
+        block[i] = original[i] ^ byte ^ pad
 
-    original_byte = block[index]  # Save the original byte before modifying it.
+    original_byte = original[index]
 
-    # Change the target byte (with our `delta` byte) until the padding is accepted.
-    for delta in range(256):
-        block[index] = original_byte ^ delta
+    def probes(deltas: Sequence[int]) -> Sequence[Probe]:
+        return workspace.probes(index, [original_byte ^ delta for delta in deltas])
 
-        if oracle.check(iv=iv, ciphertext=ciphertext):
-            if pad == 1:
-                # Resolve a potential ambiguity by modifying the byte of the left and
-                # checking again with the oracle (e.g. we turned `0x0200` into `0x0202`,
-                # which is valid padding but not the one we want; we want `0x0201`).
-                block[index - 1] ^= 1
+    calls = 0
 
-                if not oracle.check(iv=iv, ciphertext=ciphertext):
-                    continue
+    if isinstance(oracle, BatchOracle):
+        # Submit all the candidates at once, then resolve the potential ambiguity (see
+        # below) with a second batch.
+        results = oracle.check_many(probes(range(256)))
+        deltas = [delta for delta in range(256) if results[delta]]
+        calls += 256
 
-            break
+        if pad == 1:
+            block[index - 1] ^= 1
+            results = oracle.check_many(probes(deltas))
+            block[index - 1] ^= 1
+            calls += len(deltas)
+            deltas = [delta for (delta, result) in zip(deltas, results) if result]
+
+        assert deltas
+        delta = deltas[0]
+    else:
+        if order is None:
+            deltas = list(range(256))
+        else:
+            # A guess `g` of the plaintext byte corresponds to the delta `g ^ pad`.
+            deltas = [guess ^ pad for guess in order.candidates(cracked, last_block=last_block)]
+
+        (iv, ciphertext) = (workspace.iv, workspace.ciphertext)
+
+        # Change the target byte (with our `delta` byte) until the padding is accepted.
+        for delta in deltas:
+            block[index] = original_byte ^ delta
+            calls += 1
+
+            if oracle.check(iv=iv, ciphertext=ciphertext):
+                if pad == 1:
+                    # Resolve a potential ambiguity by modifying the byte of the left and
+                    # checking again with the oracle (e.g. we turned `0x0200` into
+                    # `0x0202`, which is valid padding but not the one we want; we want
+                    # `0x0201`).
+                    block[index - 1] ^= 1
+                    confirmed = oracle.check(iv=iv, ciphertext=ciphertext)
+                    block[index - 1] ^= 1
+                    calls += 1
+
+                    if not confirmed:
+                        continue
+
+                break
 
     # We changed the last byte ciphertext and it worked so we assume it turned the padding
     # into a `0x01` (or whatever we wanted based on the offset in the block). The
     # corresponding byte of plaintext can be obtained with a XOR.
-    return cracked.with_one_more_byte(pad ^ delta)
+    byte = pad ^ delta
+
+    if order is not None:
+        order.record(byte)
+
+    if stats is not None:
+        stats.calls += calls
+        # Estimation: the ambiguity check is counted only once.
+        stats.natural_calls += delta + 1 + (1 if pad == 1 else 0)
 
+    return cracked.with_one_more_byte(byte)
 
-def crack_block(oracle: Oracle, params: Params, block_number: int) -> bytes:
+
+def crack_block(
+    oracle: Oracle,
+    params: Params,
+    block_number: int,
+    order: CandidateOrder | None = None,
+    stats: Stats | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> bytes:
     """
     Crack a block and return the corresponding plaintext.
+
+    With a `checkpoint`, the attack starts from the plaintext already cracked for this
+    block, and progress is saved after each byte.
     """
 
-    # Truncate the ciphertext so that the target block is the last block.
-    params = params.with_ciphertext(
-        nth_block(
-            data=params.ciphertext,
-            block_length=params.block_length,
-            number=0,
-            count=block_number + 1,
-        )
-    )
+    last_block = block_number == len(params.ciphertext) // params.block_length - 1
+
+    # The probes are modified in place for all the bytes of the block.
+    workspace = Workspace(params=params, block_number=block_number)
 
     # First byte (from the right) -> None:
     #
@@ -159,31 +513,112 @@ def crack_block(oracle: Oracle, params: Params, block_number: int) -> bytes:
     #
     # And so on until we have a whole block of plaintext.
 
-    cracked = CrackedBlock.empty(length=params.block_length)
+    if checkpoint is None:
+        cracked = CrackedBlock.empty(length=params.block_length)
+    else:
+        cracked = checkpoint.get(block_number, block_length=params.block_length)
 
     while not cracked.is_complete():
         cracked = crack_byte(
             oracle=oracle,
             params=params,
             cracked=cracked,
+            order=order,
+            stats=stats,
+            last_block=last_block,
+            workspace=workspace,
         )
 
+        if checkpoint is not None:
+            checkpoint.save(block_number, cracked)
+
     return bytes(cracked.plaintext)
 
 
-def crack(oracle: Oracle, params: Params) -> bytes:
+def crack(
+    oracle: Oracle,
+    params: Params,
+    order: CandidateOrder | None = None,
+    stats: Stats | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> bytes:
     """
     Crack CBC using a padding oracle.
 
     This returns the plaintext corresponding to the ciphertext provided as input in the
     `params` argument.
+
+    With an `order` such as `LikelyOrder`, the most likely bytes are tried first, which
+    needs far fewer oracle calls for text. Pass `stats` to count them.
+
+    With a `checkpoint`, the attack resumes from the saved progress, if any, and the
+    checkpoint is removed once the whole plaintext is cracked.
     """
 
     block_count = len(params.ciphertext) // params.block_length
 
     cracked_blocks = [
-        crack_block(oracle=oracle, params=params, block_number=block_number)
+        crack_block(
+            oracle=oracle,
+            params=params,
+            block_number=block_number,
+            order=order,
+            stats=stats,
+            checkpoint=checkpoint,
+        )
         for block_number in range(block_count)
     ]
 
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    if stats is not None:
+        logger.debug("Oracle calls: %s (saved: %s)", stats.calls, stats.saved)
+
+    return b"".join(cracked_blocks)
+
+
+def crack_parallel(
+    oracle: Oracle,
+    params: Params,
+    pool: Literal["thread", "process"] = "thread",
+    max_workers: int | None = None,
+    on_block: Callable[[int, bytes], None] | None = None,
+) -> bytes:
+    """
+    Crack CBC using a padding oracle, with several blocks cracked at the same time.
+
+    Each block only depends on itself and the previous block, so blocks can be cracked
+    independently. With a process pool, the oracle must be picklable.
+
+    `on_block` is called with the number and the plaintext of each block as soon as it's
+    cracked, which may not be in order.
+    """
+
+    block_count = len(params.ciphertext) // params.block_length
+    cracked_blocks: list[bytes] = [b""] * block_count
+    executor: Executor
+
+    if pool == "thread":
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    with executor:
+        futures = {
+            executor.submit(
+                crack_block,
+                oracle=oracle,
+                params=params,
+                block_number=block_number,
+            ): block_number
+            for block_number in range(block_count)
+        }
+
+        for future in as_completed(futures):
+            block_number = futures[future]
+            cracked_blocks[block_number] = future.result()
+            if on_block is not None:
+                on_block(block_number, cracked_blocks[block_number])
+
     return b"".join(cracked_blocks)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+
+from typing_extensions import Protocol
+
+from cryptopals.cbc import CrackedBlock, Params
+from cryptopals.util import nth_block, nth_block_view
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOracle(Protocol):
+    async def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool: ...
+
+
+async def crack_byte(
+    oracle: AsyncOracle,
+    params: Params,
+    cracked: CrackedBlock,
+    concurrency: int = 16,
+) -> CrackedBlock:
+    """
+    Crack one byte of plaintext from a given block.
+
+    Up to `concurrency` probes are sent to the oracle at the same time. The outstanding
+    probes are cancelled (and awaited) as soon as the byte is found or a probe fails.
+    """
+
+    block_number = len(params.ciphertext) // params.block_length - 1
+    logger.debug(
+        "Cracking byte (block_number: %s, plaintext (hex): %s)",
+        block_number,
+        cracked.hex() or "-",
+    )
+
+    byte_number = len(cracked.plaintext)
+    assert byte_number < params.block_length
+
+    index = -(byte_number + 1)
+    pad = byte_number + 1
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def make_probe(delta: int, tweak_left: bool) -> tuple[bytearray, bytearray]:
+        # Each probe has its own copy since several probes are in flight at the same time.
+        iv = bytearray(params.iv)
+        ciphertext = bytearray(params.ciphertext)
+
+        if block_number < 1:
+            block = memoryview(iv)
+        else:
+            block = nth_block_view(data=ciphertext, block_length=params.block_length, number=-2)
+
+        for i, byte in zip(range(index + 1, 0), cracked.plaintext):
+            block[i] ^= byte ^ pad
+
+        block[index] ^= delta
+
+        if tweak_left:
+            block[index - 1] ^= 1
+
+        return (iv, ciphertext)
+
+    async def probe(delta: int) -> int | None:
+        async with semaphore:
+            (iv, ciphertext) = make_probe(delta, tweak_left=False)
+
+            if not await oracle.check(iv=iv, ciphertext=ciphertext):
+                return None
+
+            if pad == 1:
+                # Resolve a potential ambiguity like in the synchronous version (e.g. we
+                # turned `0x0200` into `0x0202` instead of `0x0201`).
+                (iv, ciphertext) = make_probe(delta, tweak_left=True)
+
+                if not await oracle.check(iv=iv, ciphertext=ciphertext):
+                    return None
+
+            return delta
+
+    tasks = [asyncio.create_task(probe(delta)) for delta in range(256)]
+
+    try:
+        for next_task in asyncio.as_completed(tasks):
+            delta = await next_task
+            if delta is not None:
+                return cracked.with_one_more_byte(pad ^ delta)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Wait for the cancellations, and retrieve the exceptions of the other tasks.
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert False
+
+
+async def crack_block(
+    oracle: AsyncOracle,
+    params: Params,
+    block_number: int,
+    concurrency: int = 16,
+) -> bytes:
+    """
+    Crack a block and return the corresponding plaintext.
+    """
+
+    params = params.with_ciphertext(
+        nth_block(
+            data=params.ciphertext,
+            block_length=params.block_length,
+            number=0,
+            count=block_number + 1,
+        )
+    )
+
+    cracked = CrackedBlock.empty(length=params.block_length)
+
+    while not cracked.is_complete():
+        cracked = await crack_byte(
+            oracle=oracle,
+            params=params,
+            cracked=cracked,
+            concurrency=concurrency,
+        )
+
+    return bytes(cracked.plaintext)
+
+
+async def crack(oracle: AsyncOracle, params: Params, concurrency: int = 16) -> bytes:
+    """
+    Crack CBC using an asynchronous padding oracle.
+
+    This is the same attack as `cryptopals.cbc.crack`, for oracles with a high latency
+    (e.g. remote services): several probes are sent at the same time instead of waiting
+    for each answer before sending the next probe.
+    """
+
+    block_count = len(params.ciphertext) // params.block_length
+
+    cracked_blocks = [
+        await crack_block(
+            oracle=oracle,
+            params=params,
+            block_number=block_number,
+            concurrency=concurrency,
+        )
+        for block_number in range(block_count)
+    ]
+
+    return b"".join(cracked_blocks)
@@ -1,16 +1,123 @@
+import heapq
 import itertools
-from collections import Counter
+import math
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Iterable, Iterator, Sequence
 
 import cryptopals.util
 
+Oracle = Callable[[bytes], bytes]
 
-def detect(ciphertext: bytes, block_length: int) -> bool:
-    """Detect if a ciphertext was obtained with ECB mode."""
-    blocks = cryptopals.util.chunk_bytes(ciphertext, chunk_length=block_length)
-    counts = Counter(blocks)
-    return any(count > 1 for (block, count) in counts.items())
+
+def hashable_blocks(ciphertext: cryptopals.util.Buffer, block_length: int) -> Iterator[memoryview]:
+    """
+    Split a ciphertext into blocks which can be hashed (e.g. to be added to a set).
+
+    A memory view can only be hashed if the underlying object can, so a ciphertext which
+    isn't `bytes` (e.g. a `bytearray`) is copied once. Blocks of `bytes` aren't copied.
+    """
+    if not isinstance(ciphertext, bytes):
+        ciphertext = bytes(ciphertext)
+    return cryptopals.util.iter_blocks(ciphertext, block_length=block_length)
+
+
+def detect(ciphertext: cryptopals.util.Buffer, block_length: int) -> bool:
+    """
+    Detect if a ciphertext was obtained with ECB mode.
+
+    This stops at the first repeated block.
+    """
+    seen: set[memoryview] = set()
+    for block in hashable_blocks(ciphertext, block_length=block_length):
+        if block in seen:
+            return True
+        seen.add(block)
+    return False
+
+
+def repetition_count(ciphertext: cryptopals.util.Buffer, block_length: int) -> int:
+    """Return the number of blocks which are a repetition of a previous block."""
+    blocks = list(hashable_blocks(ciphertext, block_length=block_length))
+    return len(blocks) - len(set(blocks))
+
+
+@dataclass(frozen=True)
+class Detection:
+    index: int
+    repetitions: int
+    block_count: int
+
+    @property
+    def score(self) -> float:
+        """Share of repeated blocks."""
+        return self.repetitions / self.block_count if self.block_count else 0.0
+
+
+def scan(
+    ciphertexts: Iterable[cryptopals.util.Buffer],
+    block_length: int,
+    count: int | None = None,
+) -> Sequence[Detection]:
+    """
+    Rank ciphertexts by how likely they were obtained with ECB mode, most likely first.
+
+    Ciphertexts are consumed one by one (e.g. from `cryptopals.format.read_hex_lines`)
+    and only their scores are kept, or only the `count` best ones if provided.
+    """
+
+    detections = (
+        Detection(
+            index=index,
+            repetitions=repetition_count(ciphertext, block_length=block_length),
+            block_count=len(ciphertext) // block_length,
+        )
+        for (index, ciphertext) in enumerate(ciphertexts)
+    )
+
+    def rank(detection: Detection) -> tuple[float, int]:
+        return (-detection.score, detection.index)
+
+    if count is None:
+        return sorted(detections, key=rank)
+    return heapq.nsmallest(count, detections, key=rank)
+
+
+@dataclass(frozen=True)
+class Location:
+    index: int
+    offset: int
+
+
+class BlockIndex:
+    """
+    Index of the blocks of many ciphertexts, to find blocks repeated across them (e.g.
+    several messages encrypted with ECB mode and the same key).
+
+    Only the first location of each block is kept.
+    """
+
+    def __init__(self, block_length: int) -> None:
+        self.block_length = block_length
+        self.locations: dict[bytes | memoryview, Location] = {}
+
+    def add(
+        self, index: int, ciphertext: cryptopals.util.Buffer
+    ) -> Sequence[tuple[Location, Location]]:
+        """
+        Add a ciphertext to the index and return the location of each of its blocks which
+        was already seen, with the location where it was first seen.
+        """
+        repetitions: list[tuple[Location, Location]] = []
+        blocks = hashable_blocks(ciphertext, block_length=self.block_length)
+        for number, block in enumerate(blocks):
+            location = Location(index=index, offset=number * self.block_length)
+            # Views compare and hash like bytes, so blocks are only copied when added.
+            first_location = self.locations.get(block)
+            if first_location is None:
+                self.locations[bytes(block)] = location
+            else:
+                repetitions.append((location, first_location))
+        return repetitions
 
 
 @dataclass(frozen=True)
@@ -19,7 +126,7 @@ class Lengths:
     extra_byte_count: int
 
 
-def find_lengths(oracle: Callable[[bytes], bytes]) -> Lengths:
+def find_lengths(oracle: Oracle) -> Lengths:
     """
     Find the block and fixed number of added bytes of an encryption oracle.
 
@@ -66,8 +173,118 @@ def find_lengths(oracle: Callable[[bytes], bytes]) -> Lengths:
     assert False
 
 
+def find_input_repeat(ciphertext_a: bytes, ciphertext_b: bytes, block_length: int) -> int | None:
+    """
+    Return the offset of the first block repeated right after itself in two ciphertexts,
+    obtained from inputs of the same length, where it differs between them.
+
+    Blocks which don't depend on the input (e.g. in a fixed prefix or after the input)
+    are the same in both ciphertexts so repeated blocks there are ignored.
+    """
+    blocks_a = list(cryptopals.util.iter_blocks(ciphertext_a, block_length=block_length))
+    blocks_b = list(cryptopals.util.iter_blocks(ciphertext_b, block_length=block_length))
+    for number in range(min(len(blocks_a), len(blocks_b)) - 1):
+        if (
+            blocks_a[number] == blocks_a[number + 1]
+            and blocks_b[number] == blocks_b[number + 1]
+            and blocks_a[number] != blocks_b[number]
+        ):
+            return number * block_length
+    return None
+
+
+@dataclass(frozen=True)
+class Discovery:
+    block: int
+    prefix: int
+    suffix: int
+    calls: int
+
+
+def search_lengths(oracle: Oracle, block_lengths: Sequence[int] = (8, 16, 32)) -> Discovery:
+    """
+    Find the block, prefix and suffix lengths of an ECB encryption oracle with few calls.
+
+    Unlike `find_lengths`, this only works with ECB (it relies on repeated blocks) and
+    the candidate block lengths must be known: `ValueError` is raised if none of them
+    matches. The prefix and suffix must have a fixed length.
+    """
+
+    counting_oracle = CountingOracle(oracle)
+
+    def probe(input_length: int) -> tuple[bytes, bytes]:
+        return (counting_oracle(b"A" * input_length), counting_oracle(b"B" * input_length))
+
+    # Block length: with enough identical bytes, some ciphertext blocks are repeated. With
+    # 16-byte blocks, 32-byte chunks are also repeated, but not 8-byte chunks.
+    (ciphertext_a, ciphertext_b) = probe(3 * max(block_lengths))
+    block_length = next(
+        (
+            length
+            for length in sorted(block_lengths)
+            if len(ciphertext_a) % length == 0
+            and find_input_repeat(ciphertext_a, ciphertext_b, block_length=length) is not None
+        ),
+        None,
+    )
+    if block_length is None:
+        raise ValueError(f"Block length not in {block_lengths}")
+
+    # Prefix length: the first repeated block is the first block filled by the input,
+    # right after the `pad` bytes which complete the last prefix block. Two identical
+    # blocks only appear once the input fills these bytes and then two blocks, which is
+    # monotonic in the input length, so `pad` can be found by binary search.
+    #
+    #     PPPPPAAA AAAAAAAA AAAAA___   (no repeated block)
+    #     PPPPPAAA AAAAAAAA AAAAAAAA   (repeated block, pad = 3)
+
+    offset = find_input_repeat(ciphertext_a, ciphertext_b, block_length=block_length)
+    assert offset is not None
+    lengths: dict[int, int] = {}
+
+    def has_repeated_block(input_length: int) -> bool:
+        (ciphertext_a, ciphertext_b) = probe(input_length)
+        lengths[input_length] = len(ciphertext_a)
+        return find_input_repeat(ciphertext_a, ciphertext_b, block_length=block_length) is not None
+
+    (low, high) = (2 * block_length, 3 * block_length - 1)
+    while low < high:
+        middle = (low + high) // 2
+        if has_repeated_block(middle):
+            high = middle
+        else:
+            low = middle + 1
+    pad = low - 2 * block_length
+    prefix_length = offset - pad
+
+    # Extra length: the ciphertext grows by one block as soon as the input fills the last
+    # block (see `find_lengths`), which is also monotonic in the input length.
+
+    def length(input_length: int) -> int:
+        if input_length not in lengths:
+            lengths[input_length] = len(counting_oracle(b"A" * input_length))
+        return lengths[input_length]
+
+    base_length = length(2 * block_length)
+    (low, high) = (2 * block_length + 1, 3 * block_length)
+    while low < high:
+        middle = (low + high) // 2
+        if length(middle) == base_length:
+            low = middle + 1
+        else:
+            high = middle
+    extra_byte_count = base_length - low
+
+    return Discovery(
+        block=block_length,
+        prefix=prefix_length,
+        suffix=extra_byte_count - prefix_length,
+        calls=counting_oracle.calls,
+    )
+
+
 def find_byte(
-    oracle: Callable[[bytes], bytes],
+    oracle: Oracle,
     plaintext: bytes,
     target_block: bytes,
     block_number: int,
@@ -98,3 +315,331 @@ def find_byte(
             return byte
 
     assert False
+
+
+def find_byte_batch(
+    oracle: Oracle,
+    plaintext: bytes,
+    target_block: bytes,
+    block_number: int,
+    block_length: int,
+) -> bytes:
+    """
+    Like `find_byte` but with a single call to the oracle.
+
+    The plaintext must have at least `block_length - 1` bytes: the last ones are repeated
+    with each candidate byte.
+    """
+
+    # The last `block_length - 1` bytes of the plaintext are repeated with every possible
+    # x, so that each candidate fills its own block:
+    #
+    #     ... PPPPPPP\x00 PPPPPPP\x01 ... PPPPPPP\xff -> ... C0 C1 ... C255
+    #
+    # The target block is then looked up among the candidate blocks.
+
+    known_length = block_length - 1
+    assert len(plaintext) >= known_length
+    head = plaintext[: len(plaintext) - known_length]
+    known = plaintext[len(plaintext) - known_length :]
+    candidates = b"".join(known + bytes([i]) for i in range(256))
+    ciphertext = oracle(head + candidates)
+    blocks = cryptopals.util.iter_blocks(
+        cryptopals.util.nth_block_view(
+            ciphertext,
+            block_length=block_length,
+            number=block_number,
+            count=256,
+        ),
+        block_length=block_length,
+    )
+    bytes_by_block: dict[bytes | memoryview, bytes] = {
+        block: bytes([i]) for (i, block) in enumerate(blocks)
+    }
+    byte = bytes_by_block.get(target_block)
+    if byte is None:
+        assert False
+    return byte
+
+
+def find_repeated_block(text: bytes, block_length: int) -> bytes:
+    """Return the first block which is repeated right after itself."""
+    previous_chunk = None
+
+    for chunk in cryptopals.util.iter_blocks(text, block_length):
+        if chunk == previous_chunk:
+            return bytes(chunk)
+
+        previous_chunk = chunk
+
+    assert False
+
+
+def repeated_blocks(text: bytes, block_length: int) -> set[bytes]:
+    """Return the blocks which are repeated right after themselves."""
+    pairs = itertools.pairwise(cryptopals.util.iter_blocks(text, block_length))
+    return {bytes(block) for (block, next_block) in pairs if block == next_block}
+
+
+def find_prefix_length(oracle: Oracle, block_length: int) -> int:
+    """
+    Find the length of the fixed prefix added by an encryption oracle before its input.
+    """
+
+    # For a 5-byte random prefix:
+    #
+    # 0 more "Z" bytes -> PPPPPAAA AAAAA___ ... -> ________ ________ ...
+    # 1 more "Z" bytes -> PPPPPZAA AAAAAA__ ... -> ________ ________ ...
+    # 2 more "Z" bytes -> PPPPPZZA AAAAAAA_ ... -> ________ ________ ...
+    # 3 more "Z" bytes -> PPPPPZZZ AAAAAAAA ... -> ________ aaaaaaaa ...
+    #
+    # Offset of known block: 8
+    # Prefix length: 8 - 3
+    #
+    # For a 8-byte random prefix:
+    #
+    # 0 more "Z" bytes -> PPPPPPPP AAAAAAAA ... -> ________ aaaaaaaa ...
+    #
+    # Offset of known block: 8
+    # Prefix length: 8 - 0
+    #
+    # When enough "Z" bytes are provided, a full "AAAAAAAA" block is encrypted, which we
+    # can recognize in the output, and which gives us the length of the unknown prefix.
+    # We need to also test it with a "BBBBBBBB" block to ensure we're not confused by some
+    # "A" bytes present in the unknown string.
+
+    a_block = block_length * b"A"
+    b_block = block_length * b"B"
+    a_block_ciphertext = find_repeated_block(
+        text=oracle(3 * a_block),
+        block_length=block_length,
+    )
+    b_block_ciphertext = find_repeated_block(
+        text=oracle(3 * b_block),
+        block_length=block_length,
+    )
+
+    for count in range(block_length):
+        ciphertext_a = oracle(count * b"Z" + a_block)
+        ciphertext_b = oracle(count * b"Z" + b_block)
+
+        try:
+            offset_a = ciphertext_a.index(a_block_ciphertext)
+            offset_b = ciphertext_b.index(b_block_ciphertext)
+        except ValueError:
+            continue
+
+        if offset_a == offset_b:
+            return offset_a - count
+
+    assert False
+
+
+def find_block_length(oracle: Oracle, max_block_length: int = 64) -> int:
+    """
+    Find the block length of an encryption oracle, even if it adds a prefix of random
+    length.
+
+    All the ciphertext lengths are multiples of the block length and, as the input grows
+    by `max_block_length` bytes, at least two of them are consecutive multiples.
+    """
+    return math.gcd(*(len(oracle(b"A" * length)) for length in range(max_block_length + 1)))
+
+
+class CountingOracle:
+    """
+    Oracle wrapper counting calls to the underlying oracle.
+    """
+
+    def __init__(self, oracle: Oracle) -> None:
+        self.oracle = oracle
+        self.calls = 0
+
+    def __call__(self, input_: bytes) -> bytes:
+        self.calls += 1
+        return self.oracle(input_)
+
+
+class AlignedOracle:
+    """
+    Encryption oracle of `input || suffix` from an oracle of `prefix || input || suffix`.
+
+    The prefix may have a different length for each call: two marker blocks are added
+    before the input and the call is repeated until they are aligned on blocks in the
+    ciphertext. Everything up to the markers is then removed.
+    """
+
+    def __init__(self, oracle: Oracle, block_length: int, max_attempts: int = 1024) -> None:
+        self.oracle = oracle
+        self.block_length = block_length
+        self.max_attempts = max_attempts
+        self.markers = b"\x01" * block_length + b"\x02" * block_length
+        self.encrypted_markers: bytes | None = None
+        self.filler_length = 0
+        self.prefix_lengths: set[int] = set()
+
+    def find_encrypted_markers(self) -> bytes:
+        # Three copies of a block always include two aligned ones. The prefix may also
+        # have repeated blocks, so only the ones which change with the input are kept: a
+        # marker is only repeated in the ciphertext of its own input. With a random prefix,
+        # this is ambiguous when the prefix is repeated in only one of them, so the calls
+        # are made again.
+        (marker_a, marker_b) = cryptopals.util.chunk_bytes(
+            self.markers, chunk_length=self.block_length
+        )
+        for _ in range(self.max_attempts):
+            repeated_a = repeated_blocks(self.oracle(3 * marker_a), self.block_length)
+            repeated_b = repeated_blocks(self.oracle(3 * marker_b), self.block_length)
+            only_a = repeated_a - repeated_b
+            only_b = repeated_b - repeated_a
+            if len(only_a) == 1 and len(only_b) == 1:
+                return only_a.pop() + only_b.pop()
+
+        raise RuntimeError(f"Markers not found after {self.max_attempts} attempts.")
+
+    def find_markers(self, ciphertext: bytes, encrypted_markers: bytes) -> int | None:
+        offset = ciphertext.find(encrypted_markers)
+        while offset != -1:
+            if offset % self.block_length == 0:
+                return offset
+            offset = ciphertext.find(encrypted_markers, offset + 1)
+        return None
+
+    def __call__(self, input_: bytes) -> bytes:
+        if self.encrypted_markers is None:
+            self.encrypted_markers = self.find_encrypted_markers()
+
+        # With a fixed prefix, only one filler length aligns the markers, and it's kept
+        # for the next calls. With a random prefix, any filler length works sometimes.
+        for attempt in range(self.max_attempts):
+            filler_length = (self.filler_length + attempt) % self.block_length
+            ciphertext = self.oracle(b"\x00" * filler_length + self.markers + input_)
+            offset = self.find_markers(ciphertext, self.encrypted_markers)
+            if offset is not None:
+                self.filler_length = filler_length
+                self.prefix_lengths.add(offset - filler_length)
+                return ciphertext[offset + len(self.markers) :]
+
+        raise RuntimeError(f"Markers not aligned after {self.max_attempts} attempts.")
+
+
+@dataclass(frozen=True)
+class Progress:
+    recovered: int
+    total: int
+    calls: int
+
+
+@dataclass(frozen=True)
+class Recovery:
+    suffix: bytes
+    block_length: int
+    prefix_length: int | None
+    calls: int
+
+
+def recover_suffix(
+    oracle: Oracle,
+    random_prefix: bool = False,
+    max_block_length: int = 64,
+    max_attempts: int = 1024,
+    on_progress: Callable[[Progress], None] | None = None,
+) -> Recovery:
+    """
+    Recover the unknown suffix added by an ECB encryption oracle after its input.
+
+    The oracle may also add a prefix before its input, of fixed or (with `random_prefix`)
+    random length. `max_attempts` limits the number of calls to align each input (see
+    `AlignedOracle`), which is only one call with a fixed prefix. With a fixed prefix,
+    the lengths are found with few calls for usual block lengths (see `search_lengths`),
+    and like with a random prefix otherwise (up to `max_block_length`).
+
+    The returned prefix length is `None` if it wasn't the same for every call.
+    `on_progress` is called after each recovered byte.
+    """
+
+    # Suppose the block length is 8 and the unknown suffix is `0123456789`.  At each step,
+    # a byte from the unknown suffix is discovered.  Each step is denoted with the
+    # following format:
+    #
+    #     p -> f | u -> b
+    #
+    # where:
+    #
+    # * `p`: partial plaintext which will have the unknown suffix appended to.
+    # * `f`: full plaintext, the ciphertext of which provides a reference block.
+    # * `u`: bruteforced plaintext (one call, see `find_byte_batch`) with unknown byte `x`.
+    # * `b`: the newly discovered value of that byte.
+    #
+    # Here it goes:
+    #
+    #     AAAAAAA_ ->          AAAAAAA0 ... |          AAAAAAAx -> 0
+    #     AAAAAA__ ->          AAAAAA01 ... |          AAAAAA0x -> 1
+    #     AAAAA___ ->          AAAAA012 ... |          AAAAA01x -> 2
+    #     AAAA____ ->          AAAA0123 ... |          AAAA012x -> 3
+    #     AAA_____ ->          AAA01234 ... |          AAA0123x -> 4
+    #     AA______ ->          AA012345 ... |          AA01234x -> 5
+    #     A_______ ->          A0123456 ... |          A012345x -> 6
+    #     ________ ->          01234567 ... |          0123456x -> 7
+    #     AAAAAAA_ -> AAAAAAA0 12345678 ... | AAAAAAA0 1234567x -> 8
+    #     AAAAAA__ -> AAAAAA01 23456789     | AAAAAA01 2345678x -> 9
+
+    counting_oracle = CountingOracle(oracle)
+
+    discovery = None
+    if not random_prefix:
+        try:
+            discovery = search_lengths(counting_oracle)
+        except ValueError:
+            # Unusual block length: found below as with a random prefix.
+            pass
+
+    if discovery is None:
+        block_length = find_block_length(counting_oracle, max_block_length=max_block_length)
+        aligned_oracle = AlignedOracle(
+            counting_oracle,
+            block_length=block_length,
+            max_attempts=max_attempts,
+        )
+        suffix_length = find_lengths(aligned_oracle).extra_byte_count
+    else:
+        block_length = discovery.block
+        aligned_oracle = AlignedOracle(
+            counting_oracle,
+            block_length=block_length,
+            max_attempts=max_attempts,
+        )
+        # The filler length which aligns the markers follows from the prefix length.
+        aligned_oracle.filler_length = -discovery.prefix % block_length
+        suffix_length = discovery.suffix
+    suffix = b""
+
+    for step in range(suffix_length):
+        block_cut_length = (step % block_length) + 1
+        partial_plaintext = b"A" * (block_length - block_cut_length)
+        block_number = step // block_length
+        block = cryptopals.util.nth_block(
+            aligned_oracle(partial_plaintext),
+            block_length=block_length,
+            number=block_number,
+        )
+        suffix += find_byte_batch(
+            oracle=aligned_oracle,
+            plaintext=partial_plaintext + suffix,
+            target_block=block,
+            block_number=block_number,
+            block_length=block_length,
+        )
+        if on_progress is not None:
+            on_progress(
+                Progress(recovered=len(suffix), total=suffix_length, calls=counting_oracle.calls)
+            )
+
+    prefix_lengths = aligned_oracle.prefix_lengths
+
+    return Recovery(
+        suffix=suffix,
+        block_length=block_length,
+        prefix_length=next(iter(prefix_lengths)) if len(prefix_lengths) == 1 else None,
+        calls=counting_oracle.calls,
+    )
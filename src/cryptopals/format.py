@@ -1,7 +1,7 @@
 import base64
 import binascii
 import string
-from typing import AnyStr
+from typing import AnyStr, Iterable, Iterator
 
 from . import util
 
@@ -9,7 +9,7 @@ GOOD_ASCII = string.ascii_letters + string.digits + string.punctuation + " "
 BAD_ASCII = bytes(frozenset(range(256)) - frozenset(ord(s) for s in GOOD_ASCII))
 
 
-def bytes_to_hex(bytes_: bytes) -> str:
+def bytes_to_hex(bytes_: util.Buffer) -> str:
     return binascii.hexlify(bytes_).decode("ascii")
 
 
@@ -25,6 +25,14 @@ def hex_to_bytes(string: AnyStr) -> bytes:
     return binascii.unhexlify(string)
 
 
+def read_hex_lines(lines: Iterable[AnyStr]) -> Iterator[bytes]:
+    """Decode hexadecimal lines (e.g. from a file), skipping empty lines."""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield hex_to_bytes(line)
+
+
 def hex_to_base64(string: str) -> str:
     bytes_ = hex_to_bytes(string)
     return base64.b64encode(bytes_).decode("ascii")
@@ -33,7 +41,7 @@ def hex_to_base64(string: str) -> str:
 def prettify_blocks(bytes_: bytes, block_length: int) -> str:
     blocks: list[str] = []
 
-    for chunk in util.chunk_bytes(bytes_, chunk_length=block_length):
+    for chunk in util.iter_blocks(bytes_, block_length=block_length):
         blocks.append(bytes_to_hex(chunk))
 
     return " ".join(blocks)
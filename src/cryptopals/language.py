@@ -0,0 +1,255 @@
+import abc
+import itertools
+import math
+import mmap
+import struct
+import sys
+from array import array
+from collections import Counter
+from functools import cached_property
+from pathlib import Path
+from typing import Sequence
+
+from typing_extensions import Protocol, runtime_checkable
+
+
+class Model(Protocol):
+    """
+    Language model used to score plaintexts.
+    """
+
+    def distance(self, plaintext: bytes) -> float:
+        """
+        Return how far a plaintext is from the language (lower is more likely).
+
+        An empty plaintext has a distance of 0.
+        """
+        ...
+
+    def accepts(self, plaintext: bytes) -> bool:
+        """Return whether a plaintext is likely enough to be in the language."""
+        ...
+
+
+@runtime_checkable
+class HistogramModel(Model, Protocol):
+    """
+    Model which can score a single-byte XOR decryption from the ciphertext histogram.
+    """
+
+    def histogram_distance(self, counts: Counter[int], key: int, length: int) -> float:
+        """
+        Return the distance of the plaintext obtained by XOR of a ciphertext with `key`.
+
+        `counts` is the histogram of the ciphertext and `length` its length.
+        """
+        ...
+
+    def histogram_distances(self, counts: Counter[int], length: int) -> Sequence[float]:
+        """
+        Return the distances of the plaintexts obtained with every key, by key (see
+        `histogram_distance`).
+        """
+        ...
+
+
+# Magic bytes, order (1 for unigrams, 2 for bigrams) and maximum distance, followed by
+# little-endian 32-bit floats: 256 byte costs, then 256 * 256 pair costs for bigrams.
+MAGIC = b"CPLM"
+header = struct.Struct("<4sB3xd")
+
+
+def costs_from_counts(counts: Sequence[int]) -> list[float]:
+    """
+    Return the cost (negative log2-likelihood) of each event, with add-one smoothing.
+    """
+    total = sum(counts) + len(counts)
+    return [-math.log2((count + 1) / total) for count in counts]
+
+
+def map_tables(path: Path, order: int) -> Sequence[Sequence[float]]:
+    """Memory-map the cost tables of a model file."""
+    with path.open("rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    values: Sequence[float]
+    if sys.byteorder == "little":
+        values = memoryview(mapped)[header.size :].cast("f")
+    else:
+        values = array("f", mapped[header.size :])
+        values.byteswap()
+
+    if order == 1:
+        return (values[:256],)
+    else:
+        return (values[:256], values[256 : 256 + 256 * 256])
+
+
+class TableModel(abc.ABC):
+    """
+    Model based on cost tables, either in memory or in a model file.
+
+    The tables of a model file are memory-mapped the first time they're needed.
+    """
+
+    order: int
+
+    def __init__(self, tables: Sequence[Sequence[float]] | Path, max_distance: float) -> None:
+        self.source = tables
+        self.max_distance = max_distance
+
+    @cached_property
+    def tables(self) -> Sequence[Sequence[float]]:
+        if isinstance(self.source, Path):
+            return map_tables(self.source, order=self.order)
+        return self.source
+
+    def __getstate__(self) -> dict[str, object]:
+        # Memory-mapped tables can't be pickled (e.g. to send a model to worker processes)
+        # so they're mapped again by the receiver.
+        state = self.__dict__.copy()
+        if isinstance(self.source, Path):
+            state.pop("tables", None)
+        state.pop("xor_costs", None)
+        return state
+
+    @abc.abstractmethod
+    def distance(self, plaintext: bytes) -> float: ...
+
+    def accepts(self, plaintext: bytes) -> bool:
+        return self.distance(plaintext) <= self.max_distance
+
+
+class UnigramModel(TableModel):
+    """
+    Cost of each byte, independently of its neighbors.
+
+    The distance of a plaintext is its average cost, in bits per byte.
+    """
+
+    order = 1
+
+    @classmethod
+    def from_probabilities(
+        cls, probabilities: Sequence[float], max_distance: float
+    ) -> "UnigramModel":
+        total = sum(probabilities)
+        costs = [-math.log2(probability / total) for probability in probabilities]
+        return cls(tables=(costs,), max_distance=max_distance)
+
+    def distance(self, plaintext: bytes) -> float:
+        if not plaintext:
+            return 0.0
+        (costs,) = self.tables
+        return sum(map(costs.__getitem__, plaintext)) / len(plaintext)
+
+    def histogram_distance(self, counts: Counter[int], key: int, length: int) -> float:
+        if not length:
+            return 0.0
+        (costs,) = self.tables
+        return sum(count * costs[byte ^ key] for (byte, count) in counts.items()) / length
+
+    @cached_property
+    def xor_costs(self) -> Sequence[Sequence[float]]:
+        """Cost of each byte XOR each key: `xor_costs[byte][key]` is `costs[byte ^ key]`."""
+        (costs,) = self.tables
+        return [[costs[byte ^ key] for key in range(256)] for byte in range(256)]
+
+    def histogram_distances(self, counts: Counter[int], length: int) -> Sequence[float]:
+        if not length:
+            return [0.0] * 256
+        # One row of costs (by key) per distinct byte, summed column by column.
+        rows = (
+            self.xor_costs[byte] if count == 1 else [count * cost for cost in self.xor_costs[byte]]
+            for (byte, count) in counts.items()
+        )
+        return [sum(column) / length for column in zip(*rows)]
+
+
+class BigramModel(TableModel):
+    """
+    Cost of each byte given the previous one.
+
+    The distance of a plaintext is its average cost, in bits per byte.
+    """
+
+    order = 2
+
+    def distance(self, plaintext: bytes) -> float:
+        if not plaintext:
+            return 0.0
+        (costs, pair_costs) = self.tables
+        total = costs[plaintext[0]]
+        pairs = itertools.pairwise(plaintext)
+        total += sum(pair_costs[byte_0 << 8 | byte_1] for (byte_0, byte_1) in pairs)
+        return total / len(plaintext)
+
+
+def build(corpus: bytes, order: int, slack: float = 1.0) -> UnigramModel | BigramModel:
+    """
+    Build a model from a corpus of plaintext.
+
+    A plaintext is accepted by the model if its distance is at most `slack` bits per byte
+    more than that of the corpus itself.
+    """
+
+    assert corpus
+    counts = Counter(corpus)
+    costs = costs_from_counts([counts[byte] for byte in range(256)])
+    model: UnigramModel | BigramModel
+
+    if order == 1:
+        model = UnigramModel(tables=(costs,), max_distance=0.0)
+    elif order == 2:
+        pairs = itertools.pairwise(corpus)
+        pair_counts = Counter(byte_0 << 8 | byte_1 for (byte_0, byte_1) in pairs)
+        pair_costs = [
+            cost
+            for byte_0 in range(256)
+            for cost in costs_from_counts(
+                [pair_counts[byte_0 << 8 | byte_1] for byte_1 in range(256)]
+            )
+        ]
+        model = BigramModel(tables=(costs, pair_costs), max_distance=0.0)
+    else:
+        raise ValueError(f"Unsupported order: {order}")
+
+    model.max_distance = model.distance(corpus) + slack
+    return model
+
+
+def save(model: UnigramModel | BigramModel, path: Path) -> None:
+    with path.open("wb") as file:
+        file.write(header.pack(MAGIC, model.order, model.max_distance))
+        for table in model.tables:
+            values = array("f", table)
+            if sys.byteorder != "little":
+                values.byteswap()
+            file.write(values.tobytes())
+
+
+def load(path: Path) -> UnigramModel | BigramModel:
+    """
+    Load a model file.
+
+    Only the header is read here: the tables are memory-mapped the first time they're
+    needed.
+    """
+
+    with path.open("rb") as file:
+        (magic, order, max_distance) = header.unpack(file.read(header.size))
+
+    if magic != MAGIC:
+        raise ValueError(f"Not a model file: {path}")
+
+    if order == 1:
+        return UnigramModel(tables=path, max_distance=max_distance)
+    elif order == 2:
+        return BigramModel(tables=path, max_distance=max_distance)
+    else:
+        raise ValueError(f"Unsupported order: {order}")
+
+
+def compile_corpus(corpus_path: Path, model_path: Path, order: int) -> None:
+    """Build a model from a corpus file and save it."""
+    save(build(corpus_path.read_bytes(), order=order), model_path)
@@ -1,9 +1,25 @@
+import itertools
+import math
+import os
 import string
-from typing import Iterable, List, Sequence
+from collections import Counter, defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Literal, Sequence
 
 import cryptopals.single_byte_xor
 import cryptopals.util
 import cryptopals.xor
+from cryptopals.language import HistogramModel, Model
+from cryptopals.util import Buffer, Source
 
 bit_masks = [1 << offset for offset in range(8)]
 
@@ -17,20 +33,37 @@ def bits(byte: int) -> Sequence[bool]:
 def hamming_distance(bytes_0: bytes, bytes_1: bytes) -> int:
     """Return Hamming distance between strings of the same length."""
     assert len(bytes_0) == len(bytes_1)
-    return sum(sum(bits(byte_0 ^ byte_1)) for (byte_0, byte_1) in zip(bytes_0, bytes_1))
+    integer_0 = int.from_bytes(bytes_0, "little")
+    integer_1 = int.from_bytes(bytes_1, "little")
+    return (integer_0 ^ integer_1).bit_count()
+
+
+# Translation tables mapping each byte to one of its bits (0 or 1).
+bit_tables = [bytes((byte >> offset) & 1 for byte in range(256)) for offset in range(8)]
 
 
 def evaluate_length(ciphertext: bytes, length: int) -> float:
-    chunks = cryptopals.util.chunk_bytes(ciphertext, chunk_length=length)
-    distances: List[float] = []
-    try:
-        for _ in range(64):
-            bytes_0 = next(chunks)
-            bytes_1 = next(chunks)
-            distances.append(hamming_distance(bytes_0, bytes_1) / length)
-    except StopIteration:
-        pass
-    return sum(distances) / len(distances)
+    """
+    Return the average normalized Hamming distance between all pairs of chunks.
+
+    For each bit of each column, if `c` chunks out of `m` have that bit set, it differs
+    in exactly `c * (m - c)` pairs of chunks, so the pairs don't need to be compared one
+    by one.
+    """
+    chunk_count = len(ciphertext) // length
+    pair_count = chunk_count * (chunk_count - 1) // 2
+    if pair_count == 0:
+        return math.inf
+
+    data = ciphertext[: chunk_count * length]
+    total = 0
+    for offset in range(length):
+        column = data[offset::length]
+        for table in bit_tables:
+            count = column.translate(table).count(1)
+            total += count * (chunk_count - count)
+
+    return total / (pair_count * length)
 
 
 def guess_key_length(ciphertext: bytes, lengths: Iterable[int]) -> Sequence[int]:
@@ -42,19 +75,302 @@ def transpose(rows: Iterable[bytes]) -> Sequence[bytes]:
     return [bytes(column) for column in zip(*rows)]
 
 
-def validate(plaintext: bytes) -> bool:
-    return all(byte in string.printable.encode() for byte in plaintext)
+@dataclass(frozen=True)
+class Validator:
+    """
+    Check that a plaintext is mostly made of allowed characters (e.g.
+    `string.ascii_letters + " "`).
+
+    Up to `max_error_ratio` of the bytes may be outside of the charset. Long plaintexts
+    are first checked on their first `sample_length` bytes, which rejects most wrong keys
+    without going through the whole plaintext: they're rejected if the sample alone has
+    more errors than allowed for the whole plaintext, so the result is the same.
+    """
+
+    charset: str = string.printable
+    max_error_ratio: float = 0.0
+    sample_length: int = 1024
+
+    @cached_property
+    def allowed(self) -> bytes:
+        return self.charset.encode()
+
+    def error_count(self, plaintext: bytes) -> int:
+        """Return the number of bytes outside of the charset."""
+        return len(plaintext.translate(None, delete=self.allowed))
+
+    def error_ratio(self, plaintext: bytes) -> float:
+        if not plaintext:
+            return 0.0
+        return self.error_count(plaintext) / len(plaintext)
+
+    def check(self, plaintext: bytes) -> bool:
+        if len(plaintext) > self.sample_length:
+            sample_errors = self.error_count(plaintext[: self.sample_length])
+            if sample_errors > self.max_error_ratio * len(plaintext):
+                return False
+        return self.error_ratio(plaintext) <= self.max_error_ratio
+
+
+printable_validator = Validator()
+
+
+def validate(
+    plaintext: bytes,
+    model: Model | None = None,
+    validator: Validator = printable_validator,
+) -> bool:
+    """
+    Return whether a plaintext is accepted by `validator` or, if `model` is provided,
+    by `model`.
+    """
+    if model is not None:
+        return model.accepts(plaintext)
+    return validator.check(plaintext)
 
 
-def crack(ciphertext: bytes, key_lengths: Iterable[int]) -> bytes:
+def printable_ratio(plaintext: bytes) -> float:
+    """Return the share of printable bytes in a plaintext."""
+    return 1 - printable_validator.error_ratio(plaintext)
+
+
+def crack_column(column: Buffer, model: Model | None = None) -> bytes:
+    """Return a likely single-byte key for one column of a ciphertext."""
+    if model is None:
+        return cryptopals.single_byte_xor.crack(column)
+    return cryptopals.single_byte_xor.crack(column, model=model)
+
+
+def crack(
+    ciphertext: bytes,
+    key_lengths: Iterable[int],
+    model: Model | None = None,
+    validator: Validator = printable_validator,
+) -> bytes:
+    """
+    Return a likely key assuming repeating-key XOR.
+
+    If `model` is provided, it's used both to crack each column (one byte out of key
+    length bytes, so a unigram model is more relevant than a bigram model) and to
+    validate the plaintext.
+    """
     guessed_key_lengths = guess_key_length(ciphertext, lengths=key_lengths)
     for key_length in guessed_key_lengths:
-        chunks = cryptopals.util.chunk_bytes(ciphertext, chunk_length=key_length)
-        single_byte_keys = [
-            cryptopals.single_byte_xor.crack(column) for column in transpose(chunks)
-        ]
+        columns = (
+            cryptopals.util.column_view(ciphertext, length=key_length, offset=offset)
+            for offset in range(key_length)
+        )
+        single_byte_keys = [crack_column(column, model=model) for column in columns]
         key = b"".join(single_byte_keys)
         plaintext = cryptopals.xor.decrypt(ciphertext, key=key)
-        if validate(plaintext):
+        if validate(plaintext, model=model, validator=validator):
+            return key
+    assert False
+
+
+@dataclass(frozen=True)
+class Candidate:
+    key: bytes
+    confidence: float
+    valid: bool
+
+
+def evaluate_key(
+    ciphertext: bytes,
+    key: bytes,
+    model: Model | None = None,
+    validator: Validator = printable_validator,
+) -> Candidate:
+    plaintext = cryptopals.xor.decrypt(ciphertext, key=key)
+    return Candidate(
+        key=key,
+        confidence=printable_ratio(plaintext),
+        valid=validate(plaintext, model=model, validator=validator),
+    )
+
+
+def crack_parallel(
+    ciphertext: bytes,
+    key_lengths: Iterable[int],
+    model: Model | None = None,
+    validator: Validator = printable_validator,
+    pool: Literal["thread", "process"] = "process",
+    max_workers: int | None = None,
+    stop_early: bool = True,
+) -> Sequence[Candidate]:
+    """
+    Return likely keys assuming repeating-key XOR, best first, with several columns
+    cracked at the same time.
+
+    Columns are submitted to the pool by order of likely key length and only a few of
+    them are in flight at any time, so that the ciphertext isn't copied once per key
+    length. Each key is evaluated as soon as all its columns are cracked and, with
+    `stop_early`, the remaining columns are dropped once a key is valid.
+
+    Candidates are ranked by validity, then by share of printable bytes in the
+    plaintext (`confidence`), then by likelihood of the key length. None of them may be
+    valid.
+    """
+
+    lengths = [
+        length
+        for length in guess_key_length(ciphertext, lengths=key_lengths)
+        if len(ciphertext) >= length
+    ]
+    tasks = ((length, offset) for length in lengths for offset in range(length))
+    pending: dict[Future[bytes], tuple[int, int]] = {}
+    column_keys: dict[int, dict[int, bytes]] = defaultdict(dict)
+    candidates: list[Candidate] = []
+    executor: Executor
+
+    if pool == "thread":
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    window = 2 * (max_workers or os.cpu_count() or 1)
+
+    with executor:
+        while True:
+            for length, offset in itertools.islice(tasks, window - len(pending)):
+                end = len(ciphertext) // length * length
+                column = ciphertext[offset:end:length]
+                pending[executor.submit(crack_column, column, model)] = (length, offset)
+
+            if not pending:
+                break
+
+            (done, _) = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                (length, offset) = pending.pop(future)
+                column_keys[length][offset] = future.result()
+                if len(column_keys[length]) == length:
+                    keys = column_keys.pop(length)
+                    key = b"".join(keys[offset] for offset in range(length))
+                    candidate = evaluate_key(ciphertext, key=key, model=model, validator=validator)
+                    candidates.append(candidate)
+
+            if stop_early and any(candidate.valid for candidate in candidates):
+                for future in pending:
+                    future.cancel()
+                break
+
+    return sorted(
+        candidates,
+        key=lambda candidate: (
+            not candidate.valid,
+            -candidate.confidence,
+            lengths.index(len(candidate.key)),
+        ),
+    )
+
+
+class StreamCracker:
+    """
+    Statistics of a ciphertext, updated chunk by chunk, for cracking repeating-key XOR
+    without holding the whole ciphertext in memory.
+
+    For each key length, there is one byte histogram per column of the ciphertext. This
+    is enough both to evaluate the key length (see `evaluate_length`) and to crack each
+    column (see `cryptopals.single_byte_xor.crack_histogram`).
+
+    Counting bytes for every key length is slow, so it's only done on the first
+    `sample_length` bytes: after that, only the `candidate_count` most likely key
+    lengths are kept. The sample is also kept to validate keys.
+    """
+
+    def __init__(
+        self,
+        key_lengths: Iterable[int],
+        sample_length: int = 1 << 20,
+        candidate_count: int = 3,
+    ) -> None:
+        self.histograms: dict[int, list[Counter[int]]] = {
+            length: [Counter() for _ in range(length)] for length in key_lengths
+        }
+        self.sample_length = sample_length
+        self.candidate_count = candidate_count
+        self.sample = bytearray()
+        self.position = 0
+
+    def count(self, data: bytes) -> None:
+        for length, histograms in self.histograms.items():
+            shift = self.position % length
+            for column, histogram in enumerate(histograms):
+                offset = (column - shift) % length
+                histogram.update(
+                    cryptopals.util.column_view(data, length=length, offset=offset, partial=True)
+                )
+        self.position += len(data)
+
+    def update(self, data: bytes) -> None:
+        if len(self.sample) < self.sample_length:
+            head = data[: self.sample_length - len(self.sample)]
+            data = data[len(head) :]
+            self.sample += head
+            self.count(head)
+            if len(self.sample) == self.sample_length:
+                lengths = self.guess_key_length()[: self.candidate_count]
+                self.histograms = {length: self.histograms[length] for length in lengths}
+
+        if data:
+            self.count(data)
+
+    def evaluate_length(self, length: int) -> float:
+        """
+        Return the average normalized Hamming distance between chunks, like
+        `evaluate_length`, from the column histograms.
+        """
+        total = 0
+        pair_count = 0
+        for histogram in self.histograms[length]:
+            count = histogram.total()
+            pair_count += count * (count - 1) // 2
+            for mask in bit_masks:
+                set_count = sum(n for (byte, n) in histogram.items() if byte & mask)
+                total += set_count * (count - set_count)
+
+        if pair_count == 0:
+            return math.inf
+        return total / pair_count
+
+    def guess_key_length(self) -> Sequence[int]:
+        """Return the remaining key lengths, most likely first."""
+        return sorted(self.histograms, key=self.evaluate_length)
+
+    def key(self, length: int, model: HistogramModel | None = None) -> bytes:
+        """Return a likely key of a given length."""
+        column_model = cryptopals.single_byte_xor.english_model if model is None else model
+        return b"".join(
+            cryptopals.single_byte_xor.crack_histogram(histogram, model=column_model)
+            for histogram in self.histograms[length]
+        )
+
+
+def crack_stream(
+    source: Source,
+    key_lengths: Iterable[int],
+    model: HistogramModel | None = None,
+    validator: Validator = printable_validator,
+    chunk_length: int = 1 << 20,
+    sample_length: int = 1 << 20,
+) -> bytes:
+    """
+    Return a likely key assuming repeating-key XOR, reading the ciphertext from a file or
+    a buffer (e.g. memory-mapped file) one chunk at a time.
+
+    Keys are validated on the first `sample_length` bytes of the plaintext.
+    """
+
+    cracker = StreamCracker(key_lengths, sample_length=sample_length)
+
+    for chunk in cryptopals.util.read_chunks(source, chunk_length=chunk_length):
+        cracker.update(chunk)
+
+    for key_length in cracker.guess_key_length():
+        key = cracker.key(key_length, model=model)
+        sample = cryptopals.xor.decrypt(bytes(cracker.sample), key=key)
+        if validate(sample, model=model, validator=validator):
             return key
     assert False
@@ -0,0 +1,131 @@
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Sequence
+
+import cryptopals.aes
+import cryptopals.pkcs7
+import cryptopals.util
+import cryptopals.xor
+from cryptopals.cbc import Probe
+
+
+@dataclass
+class OracleStats:
+    calls: int = 0
+    probes: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        """Average time per call, in seconds."""
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class PaddingOracle:
+    """
+    CBC padding oracle for a given key (e.g. a local stand-in for a remote service).
+
+    Only the last block of a ciphertext and the one before it (or the IV) are needed to
+    check the padding, so only the last block is decrypted, whatever the length of the
+    ciphertext.
+
+    Each call can be slowed down to simulate a remote service: `latency` seconds are
+    added to every call and, with `max_rate`, calls are spaced so that there are at
+    most `max_rate` calls per second. A batch of probes (`check_many`) is a single call.
+    """
+
+    block_length = 16
+
+    def __init__(
+        self,
+        key: bytes,
+        latency: float = 0.0,
+        max_rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.key = key
+        self.latency = latency
+        self.max_rate = max_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = OracleStats()
+        self.next_call_time = 0.0
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, object]:
+        # Locks and cipher contexts can't be pickled (e.g. to send the oracle to worker
+        # processes), so they're created again by the receiver.
+        state = self.__dict__.copy()
+        del state["lock"]
+        state.pop("aes_key", None)
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @cached_property
+    def aes_key(self) -> cryptopals.aes.AesKey:
+        return cryptopals.aes.aes_key(self.key)
+
+    def delay(self) -> None:
+        with self.lock:
+            now = self.clock()
+            start = max(now, self.next_call_time)
+            if self.max_rate is not None:
+                self.next_call_time = start + 1 / self.max_rate
+
+        delay = start - now + self.latency
+        if delay > 0:
+            self.sleep(delay)
+
+    def record(self, probe_count: int, duration: float) -> None:
+        with self.lock:
+            self.stats.calls += 1
+            self.stats.probes += probe_count
+            self.stats.total_time += duration
+            self.stats.max_time = max(self.stats.max_time, duration)
+
+    def last_blocks(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bytes | None:
+        """
+        Return the last block of a ciphertext and the one before it (or the IV), or `None`
+        if the ciphertext doesn't have a valid length.
+        """
+        block_length = self.block_length
+        if not ciphertext or len(ciphertext) % block_length != 0:
+            return None
+        if len(ciphertext) == block_length:
+            return bytes(iv[-block_length:] + ciphertext)
+        return bytes(ciphertext[-2 * block_length :])
+
+    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        (result,) = self.check_many([(iv, ciphertext)])
+        return result
+
+    def check_many(self, probes: Sequence[Probe]) -> Sequence[bool]:
+        start = self.clock()
+        self.delay()
+
+        block_length = self.block_length
+        blocks = [self.last_blocks(iv, ciphertext) for (iv, ciphertext) in probes]
+        valid_blocks = [pair for pair in blocks if pair is not None]
+
+        # The last blocks of all the probes are decrypted in one ECB call.
+        decrypted = self.aes_key.decrypt_ecb(b"".join(pair[block_length:] for pair in valid_blocks))
+        padded_blocks = cryptopals.xor.add(
+            decrypted,
+            b"".join(pair[:block_length] for pair in valid_blocks),
+        )
+        checks = iter(
+            cryptopals.pkcs7.check_many(
+                cryptopals.util.chunk_bytes(padded_blocks, chunk_length=block_length)
+            )
+        )
+        results = [pair is not None and next(checks) for pair in blocks]
+
+        self.record(len(probes), self.clock() - start)
+        return results
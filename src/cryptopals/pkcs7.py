@@ -1,22 +1,48 @@
-from typing import Optional
+from typing import Iterable, Optional, Sequence
+
+# Padding for each pad length (e.g. `b"\x03\x03\x03"` for 3).
+PADDINGS = [bytes([pad_length]) * pad_length for pad_length in range(256)]
 
 
 def pad(bytes_: bytes, block_length: int) -> bytes:
+    assert 0 < block_length < 256
     pad_length = block_length - (len(bytes_) % block_length)
-    return bytes_ + bytes([pad_length] * pad_length)
+    return bytes_ + PADDINGS[pad_length]
 
 
-def unpad(bytes_: bytes) -> Optional[bytes]:
-    try:
-        pad_length = bytes_[-1]
-    except IndexError:
+def pad_length(bytes_: bytes | bytearray) -> int | None:
+    """
+    Return the pad length of padded bytes, or `None` if the padding is invalid.
+
+    This doesn't copy the input.
+    """
+    if not bytes_:
         return None
 
-    if len(bytes_) < pad_length:
+    pad_length = bytes_[-1]
+
+    if pad_length == 0 or not bytes_.endswith(PADDINGS[pad_length]):
         return None
 
-    for padding_character in bytes_[-pad_length:]:
-        if padding_character != pad_length:
-            return None
+    return pad_length
+
+
+def check_padding(bytes_: bytes | bytearray) -> bool:
+    """
+    Return whether padding is valid, without unpadding (e.g. for a padding oracle).
+    """
+    return pad_length(bytes_) is not None
+
+
+def check_many(buffers: Iterable[bytes | bytearray]) -> Sequence[bool]:
+    """Check the padding of several buffers at once."""
+    return [pad_length(buffer) is not None for buffer in buffers]
+
+
+def unpad(bytes_: bytes) -> Optional[bytes]:
+    length = pad_length(bytes_)
+
+    if length is None:
+        return None
 
-    return bytes_[:-pad_length]
+    return bytes_[:-length]
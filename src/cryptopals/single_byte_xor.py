@@ -1,54 +1,107 @@
-import itertools
+import heapq
+import string
 from collections import Counter
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Iterable, Iterator, Sequence
 
 import cryptopals.format
+import cryptopals.language
+import cryptopals.xor
+from cryptopals.language import HistogramModel, Model
+from cryptopals.util import Buffer
 
 english_frequencies = {
     "e": 0.12702,
-    "t": 0.9056,
-    "a": 0.8167,
-    "o": 0.7507,
-    "i": 0.6966,
-    "n": 0.6749,
-    "s": 0.6327,
-    "h": 0.6094,
-    "r": 0.5987,
-    "d": 0.4253,
-    "l": 0.4025,
-    "c": 0.2782,
-    "u": 0.2758,
-    "m": 0.2406,
-    "w": 0.2360,
-    "f": 0.2228,
-    "g": 0.2015,
-    "y": 0.1974,
-    "p": 0.1929,
-    "b": 0.1492,
-    "v": 0.0978,
-    "k": 0.0772,
-    "j": 0.0153,
-    "x": 0.0150,
-    "q": 0.0095,
-    "z": 0.0074,
+    "t": 0.09056,
+    "a": 0.08167,
+    "o": 0.07507,
+    "i": 0.06966,
+    "n": 0.06749,
+    "s": 0.06327,
+    "h": 0.06094,
+    "r": 0.05987,
+    "d": 0.04253,
+    "l": 0.04025,
+    "c": 0.02782,
+    "u": 0.02758,
+    "m": 0.02406,
+    "w": 0.02360,
+    "f": 0.02228,
+    "g": 0.02015,
+    "y": 0.01974,
+    "p": 0.01929,
+    "b": 0.01492,
+    "v": 0.00978,
+    "k": 0.00772,
+    "j": 0.00153,
+    "x": 0.00150,
+    "q": 0.00095,
+    "z": 0.00074,
 }
 
+# Kept for compatibility: the scoring now uses `english_model`.
 reference_frequencies = {
     ord(letter): frequency for (letter, frequency) in english_frequencies.items()
 }
 
 
+def english_probabilities() -> list[float]:
+    """
+    Return the probability of each byte in English text.
+
+    Letters follow `english_frequencies` (mostly in lowercase) and the other printable
+    characters share the rest with spaces. Other bytes are unlikely but not impossible.
+    """
+    probabilities = [1e-6] * 256
+    others = [ord(c) for c in string.printable if c not in string.ascii_letters + " "]
+
+    for letter, frequency in english_frequencies.items():
+        probabilities[ord(letter)] += 0.8 * 0.95 * frequency
+        probabilities[ord(letter.upper())] += 0.8 * 0.05 * frequency
+
+    probabilities[ord(" ")] += 0.15
+
+    for code in others:
+        probabilities[code] += 0.05 / len(others)
+
+    return probabilities
+
+
+# English text costs about 5 bits per byte and random printable text about 9.
+english_model = cryptopals.language.UnigramModel.from_probabilities(
+    english_probabilities(),
+    max_distance=6.5,
+)
+
+
 def distance(plaintext: bytes) -> float:
-    lowered_letters = plaintext.lower()
-    counts = Counter(lowered_letters)
-    lowercase_and_non_printable = itertools.chain(
-        range(0x00, ord(" ")), range(ord("a"), ord("z")), range(0x80, 0x100)
-    )
-    return sum(
-        (counts[code] / len(plaintext) - reference_frequencies.get(code, 0.0)) ** 2
-        for code in lowercase_and_non_printable
-    )
+    return english_model.distance(plaintext)
+
+
+def key_distances(ciphertext: Buffer, model: Model = english_model) -> Sequence[float]:
+    """
+    Return the distance of the plaintext for each single-byte key, by index.
+
+    With a `HistogramModel`, XOR with a key only permutes the ciphertext histogram, so
+    the ciphertext is counted once and there is no need to decrypt it for each key.
+    """
+    if isinstance(model, HistogramModel):
+        return histogram_key_distances(Counter(ciphertext), model=model)
+
+    return [
+        model.distance(cryptopals.xor.encrypt(ciphertext, key=key_from_int(key)))
+        for key in range(255)
+    ]
+
+
+def histogram_key_distances(
+    counts: Counter[int], model: HistogramModel = english_model
+) -> Sequence[float]:
+    """
+    Return the distance of the plaintext for each single-byte key, by index, from the
+    histogram of the ciphertext.
+    """
+    return model.histogram_distances(counts, length=counts.total())[:255]
 
 
 def key_from_int(integer: int) -> bytes:
@@ -68,24 +121,57 @@ class Decryption:
         )
 
 
-def crack(ciphertext: bytes) -> bytes:
+def crack(ciphertext: Buffer, model: Model = english_model) -> bytes:
     """Return a likely single-byte key assuming XOR on English plaintext."""
-    possible_plaintexts = (
-        Decryption(
-            plaintext=cryptopals.xor.encrypt(ciphertext, key=key_from_int(integer)),
-            key=key_from_int(integer),
+    distances = key_distances(ciphertext, model=model)
+    return key_from_int(min(range(len(distances)), key=distances.__getitem__))
+
+
+def crack_histogram(counts: Counter[int], model: HistogramModel = english_model) -> bytes:
+    """Like `crack` but from the histogram of the ciphertext."""
+    distances = histogram_key_distances(counts, model=model)
+    return key_from_int(min(range(len(distances)), key=distances.__getitem__))
+
+
+@dataclass(frozen=True)
+class Candidate:
+    index: int
+    key: bytes
+    distance: float
+    plaintext: bytes
+
+
+def find_top(
+    ciphertexts: Iterable[bytes],
+    count: int = 1,
+    model: Model = english_model,
+) -> Sequence[Candidate]:
+    """
+    Return the `count` most likely plaintexts from potential ciphertexts, best first.
+
+    Ciphertexts are consumed one by one (e.g. from `cryptopals.format.read_hex_lines`) and
+    only the best candidates so far are kept in memory. Each ciphertext is scored from its
+    histogram and only the plaintexts of the returned candidates are decrypted.
+    """
+
+    def best_keys() -> Iterator[tuple[float, int, int, bytes]]:
+        for index, ciphertext in enumerate(ciphertexts):
+            distances = key_distances(ciphertext, model=model)
+            key = min(range(len(distances)), key=distances.__getitem__)
+            yield (distances[key], index, key, ciphertext)
+
+    return [
+        Candidate(
+            index=index,
+            key=key_from_int(key),
+            distance=distance,
+            plaintext=cryptopals.xor.encrypt(ciphertext, key=key_from_int(key)),
         )
-        for integer in range(0, 255)
-    )
-    best_candidate = min(possible_plaintexts, key=lambda candidate: distance(candidate.plaintext))
-    return best_candidate.key
+        for (distance, index, key, ciphertext) in heapq.nsmallest(count, best_keys())
+    ]
 
 
-def find(ciphertexts: Sequence[bytes]) -> bytes:
+def find(ciphertexts: Sequence[bytes], model: Model = english_model) -> bytes:
     """Return a likely plaintext from a list of potential ciphertexts."""
-    decryptions = (
-        Decryption.from_ciphertext(ciphertext=ciphertext, key=crack(ciphertext))
-        for ciphertext in ciphertexts
-    )
-    best_candidate = min(decryptions, key=lambda candidate: distance(candidate.plaintext))
+    (best_candidate,) = find_top(ciphertexts, count=1, model=model)
     return best_candidate.plaintext
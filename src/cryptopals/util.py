@@ -1,9 +1,15 @@
-from typing import Iterator
+import mmap
+from typing import BinaryIO, Iterator
+
+Buffer = bytes | bytearray | memoryview
+Source = BinaryIO | Buffer | mmap.mmap
 
 
 def chunk_bytes(bytes_: bytes | bytearray, chunk_length: int) -> Iterator[bytes]:
     """
     Split input bytes into chunks (copies).
+
+    The trailing partial chunk, if any, is dropped. See `iter_blocks` to avoid copies.
     """
     iteration = 0
 
@@ -21,6 +27,40 @@ def chunk_bytes(bytes_: bytes | bytearray, chunk_length: int) -> Iterator[bytes]
         iteration += 1
 
 
+def iter_blocks(data: Buffer, block_length: int, partial: bool = False) -> Iterator[memoryview]:
+    """
+    Split input bytes into blocks, as memory views (no copies).
+
+    The trailing partial block, if any, is only included with `partial`. See also
+    `remainder`.
+    """
+    view = memoryview(data)
+    end = len(view) if partial else len(view) - len(view) % block_length
+    for start in range(0, end, block_length):
+        yield view[start : start + block_length]
+
+
+def remainder(data: Buffer, block_length: int) -> memoryview:
+    """
+    Return a memory view of the trailing partial block (empty if there is none).
+    """
+    view = memoryview(data)
+    return view[len(view) - len(view) % block_length :]
+
+
+def column_view(data: Buffer, length: int, offset: int, partial: bool = False) -> memoryview:
+    """
+    Return a strided memory view of the byte at `offset` in each chunk of `length` bytes.
+
+    This is a column of the chunks seen as rows (see
+    `cryptopals.multi_byte_xor.transpose`), without copies. The trailing partial chunk,
+    if any, is only included with `partial`.
+    """
+    view = memoryview(data)
+    end = len(view) if partial else len(view) - len(view) % length
+    return view[offset:end:length]
+
+
 def nth_block(data: bytes, block_length: int, number: int, count: int | None = 1) -> bytes:
     """
     Return the nth block in a sequence of bytes.
@@ -47,3 +87,17 @@ def nth_block_view(
         return memoryview(data)[number * block_length :]
     else:
         return memoryview(data)[number * block_length : (number + count) * block_length]
+
+
+def read_chunks(source: Source, chunk_length: int) -> Iterator[bytes]:
+    """
+    Read a file or a buffer (e.g. memory-mapped file) in chunks of at most `chunk_length`
+    bytes, so that only one chunk is in memory at a time.
+    """
+    if isinstance(source, bytes | bytearray | memoryview | mmap.mmap):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_length):
+            yield bytes(view[start : start + chunk_length])
+    else:
+        while chunk := source.read(chunk_length):
+            yield chunk
@@ -1,14 +1,56 @@
 import itertools
 from typing import Iterable
 
+from cryptopals.util import Buffer
 
-def add(bytes_0: Iterable[int], bytes_1: Iterable[int]) -> bytes:
+
+def add_iterable(bytes_0: Iterable[int], bytes_1: Iterable[int]) -> bytes:
+    """
+    XOR two sequences of bytes, one byte at a time.
+
+    This works with any iterable (e.g. generators) and stops at the end of the shortest
+    one.
+    """
     return bytes(byte_0 ^ byte_1 for (byte_0, byte_1) in zip(bytes_0, bytes_1))
 
 
-def encrypt(plaintext: bytes, key: bytes) -> bytes:
-    return add(plaintext, itertools.cycle(key))
+def add_buffers(bytes_0: Buffer, bytes_1: Buffer) -> bytes:
+    """
+    XOR two buffers at once and stop at the end of the shortest one.
+
+    Both buffers are converted to big integers, so that the XOR is done by CPython on
+    whole machine words instead of one byte at a time in the interpreter.
+    """
+    length = min(len(bytes_0), len(bytes_1))
+    integer_0 = int.from_bytes(bytes_0[:length], "little")
+    integer_1 = int.from_bytes(bytes_1[:length], "little")
+    return (integer_0 ^ integer_1).to_bytes(length, "little")
+
+
+def add(bytes_0: Iterable[int], bytes_1: Iterable[int]) -> bytes:
+    if isinstance(bytes_0, Buffer) and isinstance(bytes_1, Buffer):
+        return add_buffers(bytes_0, bytes_1)
+    return add_iterable(bytes_0, bytes_1)
 
 
-def decrypt(ciphertext: bytes, key: bytes) -> bytes:
+def repeat_key(key: bytes, length: int) -> bytes:
+    """Repeat a key until it is exactly `length` bytes long."""
+    if not key:
+        return b""
+    (count, remainder) = divmod(length, len(key))
+    return key * count + key[:remainder]
+
+
+def encrypt(plaintext: Buffer, key: bytes) -> bytes:
+    if len(key) >= len(plaintext):
+        return add(plaintext, key)
+    return add(plaintext, repeat_key(key, length=len(plaintext)))
+
+
+def decrypt(ciphertext: Buffer, key: bytes) -> bytes:
     return encrypt(ciphertext, key=key)
+
+
+def encrypt_iterable(plaintext: Iterable[int], key: bytes) -> bytes:
+    """Reference implementation of `encrypt`, one byte at a time."""
+    return add_iterable(plaintext, itertools.cycle(key))
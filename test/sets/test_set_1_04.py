@@ -13,3 +13,16 @@ def test() -> None:
     result = cryptopals.single_byte_xor.find(ciphertexts)
 
     assert result == b"Now that the party is jumping\n"
+
+
+def test_top() -> None:
+    with files("test.sets.data").joinpath("1_04.txt").open() as file:
+        result = cryptopals.single_byte_xor.find_top(
+            cryptopals.format.read_hex_lines(file),
+            count=3,
+        )
+
+    assert len(result) == 3
+    assert result[0].plaintext == b"Now that the party is jumping\n"
+    assert result[0].key == b"5"
+    assert result[0].distance < result[1].distance <= result[2].distance
@@ -1,5 +1,7 @@
 import base64
+import mmap
 from importlib.resources import files
+from pathlib import Path
 
 import cryptopals.multi_byte_xor
 import cryptopals.xor
@@ -21,3 +23,29 @@ def test_crack() -> None:
     result = cryptopals.multi_byte_xor.crack(ciphertext, key_lengths=range(2, 40))
 
     assert result == b"Terminator X: Bring the noise"
+
+
+def test_crack_parallel() -> None:
+    data = files("test.sets.data").joinpath("1_06.txt").read_bytes()
+    ciphertext = base64.b64decode(data)
+
+    result = cryptopals.multi_byte_xor.crack_parallel(ciphertext, key_lengths=range(2, 40))
+
+    assert result[0].key == b"Terminator X: Bring the noise"
+    assert result[0].valid
+
+
+def test_crack_stream(tmp_path: Path) -> None:
+    data = files("test.sets.data").joinpath("1_06.txt").read_bytes()
+    path = tmp_path / "ciphertext.bin"
+    path.write_bytes(base64.b64decode(data))
+
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        result = cryptopals.multi_byte_xor.crack_stream(
+            mapped,
+            key_lengths=range(2, 40),
+            chunk_length=256,
+            sample_length=1024,
+        )
+
+    assert result == b"Terminator X: Bring the noise"
@@ -2,6 +2,7 @@ import base64
 from importlib.resources import files
 
 import cryptopals.ecb
+import cryptopals.format
 
 
 def test() -> None:
@@ -15,3 +16,12 @@ def test() -> None:
     ]
 
     assert detected == [132]
+
+
+def test_scan() -> None:
+    with files("test.sets.data").joinpath("1_08.txt").open("rb") as file:
+        ciphertexts = cryptopals.format.read_hex_lines(file)
+        (result,) = cryptopals.ecb.scan(ciphertexts, block_length=16, count=1)
+
+    assert result.index == 132
+    assert result.repetitions == 3
@@ -5,7 +5,6 @@ from typing import Callable
 import cryptopals.aes
 import cryptopals.ecb
 import cryptopals.pkcs7
-from cryptopals.util import nth_block
 
 
 def make_encryption_oracle() -> Callable[[bytes], bytes]:
@@ -27,56 +26,6 @@ def make_encryption_oracle() -> Callable[[bytes], bytes]:
     return encryption_oracle
 
 
-def find_unknown_string(
-    oracle: Callable[[bytes], bytes],
-    block_length: int,
-    unknown_string_length: int,
-) -> bytes:
-    # Suppose the block length is 8 and the unknown string is `0123456789`.  At each step,
-    # a byte from the unknown string is discovered.  Each step is denoted with the
-    # following format:
-    #
-    #     p -> f | u -> b
-    #
-    # where:
-    #
-    # * `p`: partial plaintext which will have the unknown string appended to.
-    # * `f`: full plaintext, the ciphertext of which provides a reference block.
-    # * `u`: bruteforced plaintext (max 256 attempts) with unknown byte `x`.
-    # * `b`: the newly discovered value of that byte.
-    #
-    # Here it goes:
-    #
-    #     AAAAAAA_ ->          AAAAAAA0 ... |          AAAAAAAx -> 0
-    #     AAAAAA__ ->          AAAAAA01 ... |          AAAAAA0x -> 1
-    #     AAAAA___ ->          AAAAA012 ... |          AAAAA01x -> 2
-    #     AAAA____ ->          AAAA0123 ... |          AAAA012x -> 3
-    #     AAA_____ ->          AAA01234 ... |          AAA0123x -> 4
-    #     AA______ ->          AA012345 ... |          AA01234x -> 5
-    #     A_______ ->          A0123456 ... |          A012345x -> 6
-    #     ________ ->          01234567 ... |          0123456x -> 7
-    #     AAAAAAA_ -> AAAAAAA0 12345678 ... | AAAAAAA0 1234567x -> 8
-    #     AAAAAA__ -> AAAAAA01 23456789     | AAAAAA01 2345678x -> 9
-
-    unknown_string = b""
-
-    for step in range(unknown_string_length):
-        block_cut_length = (step % block_length) + 1
-        partial_plaintext = b"A" * (block_length - block_cut_length)
-        ciphertext = oracle(partial_plaintext)
-        block_number = step // block_length
-        block = nth_block(ciphertext, block_length=block_length, number=block_number)
-        unknown_string += cryptopals.ecb.find_byte(
-            oracle=oracle,
-            plaintext=partial_plaintext + unknown_string,
-            target_block=block,
-            block_number=block_number,
-            block_length=block_length,
-        )
-
-    return unknown_string
-
-
 def test() -> None:
     encryption_oracle = make_encryption_oracle()
     lengths = cryptopals.ecb.find_lengths(encryption_oracle)
@@ -84,18 +33,14 @@ def test() -> None:
     assert lengths == cryptopals.ecb.Lengths(block=16, extra_byte_count=138)
 
     block_length = lengths.block
-    unknown_string_length = lengths.extra_byte_count
     ciphertext = encryption_oracle(b"A" * (2 * block_length))
 
     assert cryptopals.ecb.detect(ciphertext, block_length=block_length)
 
-    unknown_string = find_unknown_string(
-        oracle=encryption_oracle,
-        block_length=block_length,
-        unknown_string_length=unknown_string_length,
-    )
+    recovery = cryptopals.ecb.recover_suffix(encryption_oracle)
 
-    assert unknown_string == (
+    assert recovery.prefix_length == 0
+    assert recovery.suffix == (
         b"Rollin' in my 5.0\n"
         b"With my rag-top down so my hair can blow\n"
         b"The girlies on standby waving just to say hi\n"
@@ -8,6 +8,7 @@ import pytest
 
 import cryptopals.aes
 import cryptopals.cbc
+import cryptopals.padding_oracle
 import cryptopals.pkcs7
 from cryptopals.format import bytes_to_ascii, prettify_blocks
 
@@ -20,8 +21,7 @@ class Encrypted:
     ciphertext: bytes
 
 
-@dataclass
-class Oracle:
+class Oracle(cryptopals.padding_oracle.PaddingOracle):
     STRINGS = (
         b"MDAwMDAwTm93IHRoYXQgdGhlIHBhcnR5IGlzIGp1bXBpbmc=",
         b"MDAwMDAxV2l0aCB0aGUgYmFzcyBraWNrZWQgaW4gYW5kIHRoZSBWZWdhJ3MgYXJlIHB1bXBpbic=",
@@ -36,7 +36,7 @@ class Oracle:
     )
 
     def __init__(self) -> None:
-        self.key = os.urandom(16)
+        super().__init__(key=os.urandom(16))
 
     def encrypt(self) -> Encrypted:
         # The randomness is a bit useless here. It's kind of a waste of CPU resources.
@@ -48,11 +48,6 @@ class Oracle:
             ciphertext=cryptopals.aes.encrypt_cbc(key=self.key, plaintext=padded, iv=iv),
         )
 
-    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
-        padded = cryptopals.aes.decrypt_cbc(key=self.key, iv=iv, ciphertext=ciphertext)
-        plaintext = cryptopals.pkcs7.unpad(padded)
-        return plaintext is not None
-
 
 @pytest.mark.repeat(20)
 def test() -> None:
@@ -62,6 +57,7 @@ def test() -> None:
     encrypted = oracle.encrypt()
 
     assert oracle.check(iv=encrypted.iv, ciphertext=encrypted.ciphertext) is True
+    assert oracle.stats.calls == 1
 
     padded = cryptopals.cbc.crack(
         oracle=oracle,
@@ -1,7 +1,11 @@
+import itertools
+import os
+
 import pytest
 
 import cryptopals.aes
 import cryptopals.format
+import cryptopals.xor
 
 
 @pytest.mark.parametrize(
@@ -60,3 +64,141 @@ def test_decrypt_ecb(ciphertext: str, key: str, expected: str) -> None:
     )
 
     assert cryptopals.format.bytes_to_hex(result) == expected
+
+
+@pytest.mark.parametrize(
+    "plaintext,key,iv,expected",
+    [
+        (
+            "6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51",
+            "2b7e151628aed2a6abf7158809cf4f3c",
+            "000102030405060708090a0b0c0d0e0f",
+            "7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2",
+        ),
+        (
+            "",
+            "2b7e151628aed2a6abf7158809cf4f3c",
+            "000102030405060708090a0b0c0d0e0f",
+            "",
+        ),
+    ],
+)
+def test_cbc(plaintext: str, key: str, iv: str, expected: str) -> None:
+    ciphertext = cryptopals.aes.encrypt_cbc(
+        key=cryptopals.format.hex_to_bytes(key),
+        plaintext=cryptopals.format.hex_to_bytes(plaintext),
+        iv=cryptopals.format.hex_to_bytes(iv),
+    )
+    result = cryptopals.aes.decrypt_cbc(
+        key=cryptopals.format.hex_to_bytes(key),
+        ciphertext=ciphertext,
+        iv=cryptopals.format.hex_to_bytes(iv),
+    )
+
+    assert cryptopals.format.bytes_to_hex(ciphertext) == expected
+    assert cryptopals.format.bytes_to_hex(result) == plaintext
+
+
+@pytest.mark.parametrize("block_count", [1, 2, 7])
+def test_cbc_same_as_reference(block_count: int) -> None:
+    key = os.urandom(16)
+    iv = os.urandom(16)
+    plaintext = os.urandom(16 * block_count)
+
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    result = cryptopals.aes.decrypt_cbc(key=key, ciphertext=ciphertext, iv=iv)
+
+    assert ciphertext == cryptopals.aes.encrypt_cbc_reference(key=key, plaintext=plaintext, iv=iv)
+    assert result == cryptopals.aes.decrypt_cbc_reference(key=key, ciphertext=ciphertext, iv=iv)
+    assert result == plaintext
+
+
+def test_aes_key() -> None:
+    key = os.urandom(16)
+    aes_key = cryptopals.aes.AesKey(key)
+    data = os.urandom(64)
+    iv = os.urandom(16)
+    nonce = os.urandom(8)
+    aes = cryptopals.aes
+
+    assert aes.encrypt_ecb(aes_key, data) == aes.encrypt_ecb(key, data)
+    assert aes.decrypt_ecb(aes_key, data) == aes.decrypt_ecb(key, data)
+    assert aes.encrypt_cbc(aes_key, data, iv=iv) == aes.encrypt_cbc(key, data, iv=iv)
+    assert aes.decrypt_cbc(aes_key, data, iv=iv) == aes.decrypt_cbc(key, data, iv=iv)
+    assert aes.encrypt_ctr(aes_key, data, nonce=nonce) == aes.encrypt_ctr(key, data, nonce=nonce)
+
+
+def test_aes_key_partial_block() -> None:
+    aes_key = cryptopals.aes.AesKey(b"\x00" * 16)
+
+    with pytest.raises(ValueError):
+        aes_key.encrypt_ecb(b"\x00" * 17)
+
+    assert aes_key.encrypt_ecb(b"\x00" * 16) == cryptopals.aes.encrypt_ecb(
+        b"\x00" * 16, b"\x00" * 16
+    )
+
+
+def test_key_cache() -> None:
+    cache = cryptopals.aes.KeyCache(maxsize=2)
+
+    key_0 = cache.get(b"\x00" * 16)
+    cache.get(b"\x01" * 16)
+
+    assert cache.get(bytearray(b"\x00" * 16)) is key_0
+
+    cache.get(b"\x02" * 16)  # Evicts `\x01` keys, the least recently used.
+
+    assert len(cache) == 2
+    assert cache.get(b"\x00" * 16) is key_0
+
+
+def test_key_cache_disabled() -> None:
+    cache = cryptopals.aes.KeyCache(maxsize=0)
+
+    key = cache.get(b"\x00" * 16)
+
+    assert len(cache) == 0
+    assert cache.get(b"\x00" * 16) is not key
+
+
+def test_ctr_same_as_blocks() -> None:
+    key = os.urandom(16)
+    nonce = os.urandom(8)
+    plaintext = os.urandom(100)
+    keystream = b"".join(itertools.islice(cryptopals.aes.gen_ctr_blocks(key, nonce), 7))
+
+    result = cryptopals.aes.encrypt_ctr(key=key, plaintext=plaintext, nonce=nonce)
+
+    assert result == cryptopals.xor.add(plaintext, keystream)
+
+
+@pytest.mark.parametrize("chunk_length", [1, 7, 16, 33, 1000])
+@pytest.mark.parametrize("batch_block_count", [1, 2, 256])
+def test_ctr_update(chunk_length: int, batch_block_count: int) -> None:
+    key = os.urandom(16)
+    nonce = os.urandom(8)
+    plaintext = os.urandom(200)
+    ctr = cryptopals.aes.Ctr(key=key, nonce=nonce, batch_block_count=batch_block_count)
+
+    result = b"".join(
+        ctr.update(plaintext[offset : offset + chunk_length])
+        for offset in range(0, len(plaintext), chunk_length)
+    )
+
+    assert result == cryptopals.aes.encrypt_ctr(key=key, plaintext=plaintext, nonce=nonce)
+    assert ctr.offset == len(plaintext)
+
+
+@pytest.mark.parametrize("offset", [0, 1, 15, 16, 17, 150])
+def test_ctr_seek(offset: int) -> None:
+    key = os.urandom(16)
+    nonce = os.urandom(8)
+    ciphertext = os.urandom(200)
+    ctr = cryptopals.aes.Ctr(key=key, nonce=nonce)
+
+    ctr.seek(offset)
+    result = ctr.update(ciphertext[offset : offset + 20])
+
+    plaintext = cryptopals.aes.decrypt_ctr(key=key, ciphertext=ciphertext, nonce=nonce)
+    assert result == plaintext[offset : offset + 20]
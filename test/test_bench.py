@@ -0,0 +1,69 @@
+import itertools
+from typing import Iterator
+
+import pytest
+
+import bench.harness
+from bench.harness import Comparison, Result
+
+
+@pytest.mark.parametrize(
+    "baseline,result,expected",
+    [
+        (Result("f", 1, seconds=1.0), Result("f", 1, seconds=1.1), False),
+        (Result("f", 1, seconds=1.0), Result("f", 1, seconds=1.3), True),
+        (Result("f", 1, seconds=1.0), Result("f", 1, seconds=0.5), False),
+        (
+            Result("f", 1, seconds=1.0, spread=0.1),
+            Result("f", 1, seconds=1.3, spread=0.1),
+            False,
+        ),
+        (
+            Result("f", 1, seconds=1.0, spread=0.1),
+            Result("f", 1, seconds=1.5, spread=0.1),
+            True,
+        ),
+        (
+            Result("f", 1, seconds=1.0, calls=100),
+            Result("f", 1, seconds=2.0, calls=100),
+            False,
+        ),
+        (
+            Result("f", 1, seconds=1.0, calls=100),
+            Result("f", 1, seconds=1.0, calls=130),
+            True,
+        ),
+        (
+            Result("f", 1, seconds=1.0, calls=100),
+            Result("f", 1, seconds=2.0, calls=None),
+            True,
+        ),
+    ],
+)
+def test_is_regression(baseline: Result, result: Result, expected: bool) -> None:
+    comparison = Comparison(baseline=baseline, result=result)
+
+    assert comparison.is_regression(threshold=0.2) == expected
+
+
+def test_compare() -> None:
+    baseline = [Result("f", 1, seconds=1.0), Result("f", 2, seconds=2.0)]
+    results = [Result("f", 2, seconds=3.0), Result("g", 1, seconds=1.0)]
+
+    result = bench.harness.compare(baseline, results)
+
+    assert result == [Comparison(baseline=baseline[1], result=results[0])]
+
+
+@pytest.mark.parametrize(
+    "calls,expected",
+    [
+        (itertools.repeat(3), 3),
+        (itertools.count(), None),
+    ],
+)
+def test_measure_attack(calls: Iterator[int], expected: int | None) -> None:
+    result = bench.harness.measure_attack("f", 1, lambda: next(calls), repeat=2)
+
+    assert result.calls == expected
+    assert result.seconds > 0
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Sequence
 
 import pytest
 
@@ -13,8 +15,19 @@ class Oracle:
 
     def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
         padded = cryptopals.aes.decrypt_cbc(key=self.key, iv=iv, ciphertext=ciphertext)
-        plaintext = cryptopals.pkcs7.unpad(padded)
-        return plaintext is not None
+        return cryptopals.pkcs7.check_padding(padded)
+
+
+@dataclass(frozen=True)
+class BatchOracle:
+    key: bytes
+
+    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        raise AssertionError("`check_many` should be used instead")
+
+    def check_many(self, probes: Sequence[cryptopals.cbc.Probe]) -> Sequence[bool]:
+        oracle = Oracle(key=self.key)
+        return [oracle.check(iv=iv, ciphertext=ciphertext) for (iv, ciphertext) in probes]
 
 
 @pytest.mark.parametrize(
@@ -28,12 +41,128 @@ class Oracle:
         b"\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff",
     ],
 )
-def test_crack(plaintext: bytes) -> None:
+@pytest.mark.parametrize("oracle_class", [Oracle, BatchOracle])
+@pytest.mark.parametrize("short_probes", [True, False])
+def test_crack(
+    plaintext: bytes,
+    oracle_class: type[Oracle | BatchOracle],
+    short_probes: bool,
+) -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = oracle_class(key=key)
+
+    result = cryptopals.cbc.crack(
+        oracle=oracle,
+        params=cryptopals.cbc.Params(
+            block_length=block_length,
+            iv=iv,
+            ciphertext=ciphertext,
+            short_probes=short_probes,
+        ),
+    )
+
+    assert result == plaintext
+
+
+@dataclass
+class RecordingOracle:
+    oracle: BatchOracle
+    lengths: set[int]
+    buffers: set[int]
+
+    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        raise AssertionError("`check_many` should be used instead")
+
+    def check_many(self, probes: Sequence[cryptopals.cbc.Probe]) -> Sequence[bool]:
+        results: list[bool] = []
+        for probe in probes:
+            (_, ciphertext) = probe
+            self.lengths.add(len(ciphertext))
+            self.buffers.add(id(ciphertext))
+            results.extend(self.oracle.check_many([probe]))
+        return results
+
+
+def test_crack_shared_probes() -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    plaintext = b"abcdefghijklmnopqrstuvwxyzABCDEF"
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = RecordingOracle(oracle=BatchOracle(key=key), lengths=set(), buffers=set())
+
+    result = cryptopals.cbc.crack_block(
+        oracle=oracle,
+        params=cryptopals.cbc.Params(block_length=block_length, iv=iv, ciphertext=ciphertext),
+        block_number=1,
+    )
+
+    assert result == b"qrstuvwxyzABCDEF"
+    assert oracle.lengths == {2 * block_length}
+    assert len(oracle.buffers) == 1
+
+
+def test_crack_byte() -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=b"abcdefghijklmnop", iv=iv)
+    cracked = cryptopals.cbc.CrackedBlock.from_plaintext(length=block_length, plaintext=b"op")
+
+    result = cryptopals.cbc.crack_byte(
+        oracle=Oracle(key=key),
+        params=cryptopals.cbc.Params(block_length=block_length, iv=iv, ciphertext=ciphertext),
+        cracked=cracked,
+    )
+
+    assert bytes(result.plaintext) == b"nop"
+    assert bytes(cracked.plaintext) == b"op"
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_crack_parallel(pool: Literal["thread", "process"]) -> None:
     block_length = 16
     key = b"\x00" * block_length
     iv = b"\x01" * block_length
+    plaintext = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUV"
     ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
     oracle = Oracle(key=key)
+    cracked_blocks: dict[int, bytes] = {}
+
+    result = cryptopals.cbc.crack_parallel(
+        oracle=oracle,
+        params=cryptopals.cbc.Params(
+            block_length=block_length,
+            iv=iv,
+            ciphertext=ciphertext,
+        ),
+        pool=pool,
+        max_workers=2,
+        on_block=cracked_blocks.__setitem__,
+    )
+
+    assert result == plaintext
+    assert cracked_blocks == {
+        0: b"abcdefghijklmnop",
+        1: b"qrstuvwxyzABCDEF",
+        2: b"GHIJKLMNOPQRSTUV",
+    }
+
+
+def test_crack_likely_order() -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    plaintext = cryptopals.pkcs7.pad(
+        b"Cooking MC's like a pound of bacon, burning 'em if you ain't quick and nimble",
+        block_length=block_length,
+    )
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = Oracle(key=key)
+    stats = cryptopals.cbc.Stats()
 
     result = cryptopals.cbc.crack(
         oracle=oracle,
@@ -42,6 +171,142 @@ def test_crack(plaintext: bytes) -> None:
             iv=iv,
             ciphertext=ciphertext,
         ),
+        order=cryptopals.cbc.LikelyOrder(),
+        stats=stats,
     )
 
     assert result == plaintext
+    assert stats.calls * 4 < stats.natural_calls
+    assert stats.saved == stats.natural_calls - stats.calls
+
+
+@pytest.mark.parametrize(
+    "plaintext,last_block,expected",
+    [
+        (b"", True, b"\x01\x02\x03"),
+        (b"\x03", True, b"\x03 e"),
+        (b"\x03\x03\x03", True, b" et"),
+        (b"", False, b" et"),
+    ],
+)
+def test_likely_order(plaintext: bytes, last_block: bool, expected: bytes) -> None:
+    order = cryptopals.cbc.LikelyOrder()
+    cracked = cryptopals.cbc.CrackedBlock.from_plaintext(length=16, plaintext=plaintext)
+
+    result = order.candidates(cracked, last_block=last_block)
+
+    assert sorted(result) == list(range(256))
+    assert bytes(result[:3]) == expected
+
+
+def test_cracked_block() -> None:
+    cracked = cryptopals.cbc.CrackedBlock.empty(length=3)
+
+    cracked.add_byte(ord("c"))
+    copy = cracked.with_one_more_byte(ord("b"))
+    cracked.add_byte(ord("x"))
+
+    assert bytes(cracked.plaintext) == b"xc"
+    assert bytes(copy.plaintext) == b"bc"
+    assert not copy.is_complete()
+    assert copy.with_one_more_byte(ord("a")).is_complete()
+
+
+@dataclass
+class FailingOracle:
+    oracle: Oracle
+    calls_left: int
+
+    def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        if self.calls_left == 0:
+            raise ConnectionError()
+        self.calls_left -= 1
+        return self.oracle.check(iv=iv, ciphertext=ciphertext)
+
+
+def test_crack_checkpoint(tmp_path: Path) -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    plaintext = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUV"
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    params = cryptopals.cbc.Params(block_length=block_length, iv=iv, ciphertext=ciphertext)
+    path = tmp_path / "checkpoint.jsonl"
+    failing_oracle = FailingOracle(oracle=Oracle(key=key), calls_left=2500)
+    stats = cryptopals.cbc.Stats()
+
+    with pytest.raises(ConnectionError):
+        cryptopals.cbc.crack(
+            oracle=failing_oracle,
+            params=params,
+            checkpoint=cryptopals.cbc.Checkpoint(path, params=params),
+        )
+
+    checkpoint = cryptopals.cbc.Checkpoint(path, params=params)
+
+    assert bytes(checkpoint.blocks[0].plaintext) == b"abcdefghijklmnop"
+    assert not checkpoint.blocks[1].is_complete()
+
+    result = cryptopals.cbc.crack(
+        oracle=Oracle(key=key),
+        params=params,
+        stats=stats,
+        checkpoint=checkpoint,
+    )
+
+    full_stats = cryptopals.cbc.Stats()
+    cryptopals.cbc.crack(oracle=Oracle(key=key), params=params, stats=full_stats)
+
+    assert result == plaintext
+    assert stats.calls < full_stats.calls - 2000  # Only the last byte is cracked again.
+    assert not path.exists()
+
+
+def test_checkpoint_other_ciphertext(tmp_path: Path) -> None:
+    params = cryptopals.cbc.Params(block_length=16, iv=b"\x00" * 16, ciphertext=b"\x00" * 16)
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = cryptopals.cbc.Checkpoint(path, params=params)
+    checkpoint.save(0, cryptopals.cbc.CrackedBlock.from_plaintext(length=16, plaintext=b"a"))
+
+    with pytest.raises(ValueError):
+        cryptopals.cbc.Checkpoint(path, params=params.with_ciphertext(b"\x01" * 16))
+
+
+@pytest.mark.parametrize("header", ["", '{"dig', "[]", '{"digest": "00"}'])
+def test_checkpoint_invalid_header(tmp_path: Path, header: str) -> None:
+    params = cryptopals.cbc.Params(block_length=16, iv=b"\x00" * 16, ciphertext=b"\x00" * 16)
+    path = tmp_path / "checkpoint.jsonl"
+    path.write_text(header + "\n" + '{"block": 0, "plaintext": "61"}\n')
+
+    with pytest.raises(ValueError):
+        cryptopals.cbc.Checkpoint(path, params=params)
+
+
+def test_checkpoint_header(tmp_path: Path) -> None:
+    params = cryptopals.cbc.Params(block_length=16, iv=b"\x00" * 16, ciphertext=b"\x00" * 16)
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = cryptopals.cbc.Checkpoint(path, params=params)
+    checkpoint.save(0, cryptopals.cbc.CrackedBlock.from_plaintext(length=16, plaintext=b"a"))
+
+    result = cryptopals.cbc.Checkpoint(path, params=params)
+
+    assert bytes(result.blocks[0].plaintext) == b"a"
+    assert [path.name for path in tmp_path.iterdir()] == ["checkpoint.jsonl"]
+
+
+def test_checkpoint_invalid_lines(tmp_path: Path) -> None:
+    params = cryptopals.cbc.Params(block_length=16, iv=b"\x00" * 16, ciphertext=b"\x00" * 32)
+    path = tmp_path / "checkpoint.jsonl"
+    cryptopals.cbc.Checkpoint(path, params=params).save(
+        0, cryptopals.cbc.CrackedBlock.from_plaintext(length=16, plaintext=b"a")
+    )
+    with path.open("a") as file:
+        file.write('{"block": 0}\n{"block": "0", "plaintext": "62"}\n{"block": 1, "plain')
+
+    checkpoint = cryptopals.cbc.Checkpoint(path, params=params)
+    checkpoint.save(1, cryptopals.cbc.CrackedBlock.from_plaintext(length=16, plaintext=b"c"))
+    result = cryptopals.cbc.Checkpoint(path, params=params)
+
+    assert sorted(result.blocks) == [0, 1]
+    assert bytes(result.blocks[0].plaintext) == b"a"
+    assert bytes(result.blocks[1].plaintext) == b"c"
@@ -0,0 +1,105 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+import cryptopals.aes
+import cryptopals.cbc
+import cryptopals.cbc_async
+import cryptopals.pkcs7
+
+
+@dataclass
+class Oracle:
+    key: bytes
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    async def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            padded = cryptopals.aes.decrypt_cbc(key=self.key, iv=iv, ciphertext=ciphertext)
+            return cryptopals.pkcs7.check_padding(padded)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.parametrize(
+    "plaintext",
+    [
+        b"abcdefghijklmnop",
+        b"abcdefghijklmnopqrstuvwxyzABCDEF",
+        b"abcdefghijklmn\x02\x01",
+        b"abcdefghijklmn\x02\x02",
+        b"\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff",
+    ],
+)
+@pytest.mark.parametrize("concurrency", [1, 4, 256])
+def test_crack(plaintext: bytes, concurrency: int) -> None:
+    block_length = 16
+    key = b"\x00" * block_length
+    iv = b"\x01" * block_length
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = Oracle(key=key)
+
+    result = asyncio.run(
+        cryptopals.cbc_async.crack(
+            oracle=oracle,
+            params=cryptopals.cbc.Params(
+                block_length=block_length,
+                iv=iv,
+                ciphertext=ciphertext,
+            ),
+            concurrency=concurrency,
+        )
+    )
+
+    assert result == plaintext
+    assert oracle.max_in_flight <= concurrency
+
+
+@dataclass
+class FailingOracle:
+    """
+    Oracle failing on its first call, while the other calls wait until they're cancelled.
+    """
+
+    calls: int = 0
+    cancelled: int = 0
+
+    async def check(self, iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        assert False
+
+
+def test_crack_byte_failure() -> None:
+    block_length = 16
+    oracle = FailingOracle()
+
+    async def crack_byte() -> set[asyncio.Task[object]]:
+        with pytest.raises(ConnectionError):
+            await cryptopals.cbc_async.crack_byte(
+                oracle=oracle,
+                params=cryptopals.cbc.Params(
+                    block_length=block_length,
+                    iv=b"\x00" * block_length,
+                    ciphertext=b"\x00" * block_length,
+                ),
+                cracked=cryptopals.cbc.CrackedBlock.empty(length=block_length),
+                concurrency=4,
+            )
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    pending_tasks = asyncio.run(crack_byte())
+
+    assert pending_tasks == set()
+    assert oracle.cancelled == oracle.calls - 1
@@ -0,0 +1,255 @@
+import hashlib
+import os
+import random
+from typing import Callable
+
+import pytest
+
+import cryptopals.aes
+import cryptopals.ecb
+import cryptopals.pkcs7
+import cryptopals.util
+from cryptopals.ecb import Location
+from cryptopals.util import nth_block
+
+
+class Oracle:
+    """
+    ECB encryption of `prefix || input || secret`, counting calls.
+
+    With `random_prefix`, the prefix is cut to a random length at each call.
+    """
+
+    def __init__(self, prefix: bytes, secret: bytes, random_prefix: bool = False) -> None:
+        self.key = os.urandom(16)
+        self.prefix = prefix
+        self.secret = secret
+        self.random_prefix = random_prefix
+        self.random = random.Random(0)
+        self.calls = 0
+
+    def __call__(self, input_: bytes) -> bytes:
+        self.calls += 1
+        prefix = self.prefix
+        if self.random_prefix:
+            prefix = prefix[: self.random.randrange(len(prefix) + 1)]
+        plaintext = cryptopals.pkcs7.pad(prefix + input_ + self.secret, block_length=16)
+        return cryptopals.aes.encrypt_ecb(key=self.key, plaintext=plaintext)
+
+
+class HashOracle:
+    """
+    ECB-like encryption of `prefix || input || secret` with 24-byte blocks, each block
+    being replaced by its keyed hash (which doesn't need to be decrypted).
+    """
+
+    block_length = 24
+
+    def __init__(self, prefix: bytes, secret: bytes) -> None:
+        self.key = os.urandom(16)
+        self.prefix = prefix
+        self.secret = secret
+
+    def __call__(self, input_: bytes) -> bytes:
+        plaintext = cryptopals.pkcs7.pad(
+            self.prefix + input_ + self.secret, block_length=self.block_length
+        )
+        return b"".join(
+            hashlib.blake2b(block, key=self.key, digest_size=self.block_length).digest()
+            for block in cryptopals.util.iter_blocks(plaintext, block_length=self.block_length)
+        )
+
+
+@pytest.mark.parametrize("prefix", [b"", b"p", b"p" * 16, b"p" * 21])
+@pytest.mark.parametrize(
+    "find_byte",
+    [cryptopals.ecb.find_byte, cryptopals.ecb.find_byte_batch],
+)
+def test_find_byte(prefix: bytes, find_byte: Callable[..., bytes]) -> None:
+    secret = b"\xf3secret"
+    oracle = Oracle(prefix=prefix, secret=secret)
+    padding = b"Z" * (-len(prefix) % 16)
+    block_number = (len(prefix) + len(padding)) // 16 + 1
+    plaintext = padding + b"A" * 31
+    target_block = nth_block(oracle(plaintext), block_length=16, number=block_number)
+    oracle.calls = 0
+
+    result = find_byte(
+        oracle=oracle,
+        plaintext=plaintext,
+        target_block=target_block,
+        block_number=block_number,
+        block_length=16,
+    )
+
+    assert result == b"\xf3"
+    if find_byte is cryptopals.ecb.find_byte_batch:
+        assert oracle.calls == 1
+
+
+@pytest.mark.parametrize(
+    "plaintext,target_block",
+    [
+        (b"A" * 14, b"\x00" * 16),  # Plaintext too short.
+        (b"A" * 15, b"\x00" * 16),  # Target block not found.
+    ],
+)
+def test_find_byte_batch_invalid(plaintext: bytes, target_block: bytes) -> None:
+    oracle = Oracle(prefix=b"", secret=b"secret")
+
+    with pytest.raises(AssertionError):
+        cryptopals.ecb.find_byte_batch(
+            oracle=oracle,
+            plaintext=plaintext,
+            target_block=target_block,
+            block_number=0,
+            block_length=16,
+        )
+
+
+@pytest.mark.parametrize("random_prefix", [False, True])
+def test_find_block_length(random_prefix: bool) -> None:
+    oracle = Oracle(prefix=b"p" * 40, secret=b"secret", random_prefix=random_prefix)
+
+    result = cryptopals.ecb.find_block_length(oracle)
+
+    assert result == 16
+
+
+@pytest.mark.parametrize("prefix", [b"", b"p", b"p" * 16, b"p" * 21, b"X" * 32, b"X" * 50])
+def test_recover_suffix(prefix: bytes) -> None:
+    secret = b"Rollin' in my 5.0\nWith my rag-top down so my hair can blow\n\x00\x01\x02"
+    oracle = Oracle(prefix=prefix, secret=secret)
+    progress: list[cryptopals.ecb.Progress] = []
+
+    result = cryptopals.ecb.recover_suffix(oracle, on_progress=progress.append)
+
+    assert result.suffix == secret
+    assert result.block_length == 16
+    assert result.prefix_length == len(prefix)
+    assert result.calls == oracle.calls
+    assert [p.recovered for p in progress] == list(range(1, len(secret) + 1))
+    assert all(p.total == len(secret) for p in progress)
+    assert [p.calls for p in progress] == sorted(p.calls for p in progress)
+    # Two calls per byte, and the setup.
+    assert result.calls <= 2 * len(secret) + 64
+
+
+@pytest.mark.parametrize("prefix", [bytes(range(40)), b"X" * 40])
+def test_recover_suffix_random_prefix(prefix: bytes) -> None:
+    secret = b"Did you stop? No, I just drove by\n"
+    oracle = Oracle(prefix=prefix, secret=secret, random_prefix=True)
+
+    result = cryptopals.ecb.recover_suffix(oracle, random_prefix=True)
+
+    assert result.suffix == secret
+    assert result.block_length == 16
+    assert result.prefix_length is None
+    assert result.calls == oracle.calls
+
+
+@pytest.mark.parametrize("random_prefix", [False, True])
+def test_recover_suffix_repeated_prefix(random_prefix: bool) -> None:
+    oracle = Oracle(prefix=b"X" * 32, secret=b"secret!", random_prefix=random_prefix)
+
+    result = cryptopals.ecb.recover_suffix(oracle, random_prefix=random_prefix)
+
+    assert result.suffix == b"secret!"
+    assert result.prefix_length == (None if random_prefix else 32)
+
+
+@pytest.mark.parametrize("prefix", [b"", b"p" * 30])
+def test_recover_suffix_other_block_length(prefix: bytes) -> None:
+    secret = b"Cooking MC's like a pound of bacon"
+    oracle = HashOracle(prefix=prefix, secret=secret)
+
+    result = cryptopals.ecb.recover_suffix(oracle)
+
+    assert result.suffix == secret
+    assert result.block_length == 24
+    assert result.prefix_length == len(prefix)
+
+
+def test_search_lengths_other_block_length() -> None:
+    with pytest.raises(ValueError):
+        cryptopals.ecb.search_lengths(HashOracle(prefix=b"", secret=b"secret"))
+
+
+def test_recover_suffix_max_attempts() -> None:
+    oracle = Oracle(prefix=os.urandom(40), secret=b"secret", random_prefix=True)
+
+    with pytest.raises(RuntimeError):
+        cryptopals.ecb.recover_suffix(oracle, random_prefix=True, max_attempts=1)
+
+
+@pytest.mark.parametrize(
+    "prefix",
+    [b"", b"p", b"A" * 5, b"pB", b"p" * 15, b"p" * 16, b"p" * 21, b"A" * 40],
+)
+@pytest.mark.parametrize("secret", [b"", b"s", b"AAAAsecret", b"s" * 16, b"s" * 40])
+def test_search_lengths(prefix: bytes, secret: bytes) -> None:
+    oracle = Oracle(prefix=prefix, secret=secret)
+
+    result = cryptopals.ecb.search_lengths(oracle)
+
+    assert result == cryptopals.ecb.Discovery(
+        block=16,
+        prefix=len(prefix),
+        suffix=len(secret),
+        calls=oracle.calls,
+    )
+    assert result.calls <= 2 + 2 * 4 + 1 + 4
+
+
+@pytest.mark.parametrize(
+    "ciphertext,expected",
+    [
+        (b"", False),
+        (b"abcd", False),
+        (b"abcdabcd", True),
+        (b"abcdefghabcd", True),
+        (b"abcdefghabc", False),
+        (b"aabcdbcd", False),
+        (bytearray(b"abcdabcd"), True),
+        (memoryview(bytearray(b"abcdefgh")), False),
+    ],
+)
+def test_detect(ciphertext: bytes, expected: bool) -> None:
+    result = cryptopals.ecb.detect(ciphertext, block_length=4)
+
+    assert result == expected
+
+
+def test_scan() -> None:
+    ciphertexts = [b"abcdefgh", b"abcdabcdabcdefgh", b"", b"abcdabcd", b"abcdefghabcd"]
+
+    result = cryptopals.ecb.scan(ciphertexts, block_length=4)
+
+    assert [(detection.index, detection.repetitions) for detection in result] == [
+        (1, 2),
+        (3, 1),
+        (4, 1),
+        (0, 0),
+        (2, 0),
+    ]
+    assert cryptopals.ecb.scan(ciphertexts, block_length=4, count=2) == result[:2]
+
+
+def test_scan_bytearray() -> None:
+    ciphertexts = [bytearray(b"abcdefgh"), bytearray(b"abcdabcd")]
+
+    result = cryptopals.ecb.scan(ciphertexts, block_length=4)
+
+    assert [(detection.index, detection.repetitions) for detection in result] == [(1, 1), (0, 0)]
+
+
+def test_block_index() -> None:
+    index = cryptopals.ecb.BlockIndex(block_length=4)
+
+    assert index.add(0, b"abcdefgh") == []
+    assert index.add(1, b"ijklabcd") == [(Location(1, 4), Location(0, 0))]
+    assert index.add(2, b"efghefgh") == [
+        (Location(2, 0), Location(0, 4)),
+        (Location(2, 4), Location(0, 4)),
+    ]
+    assert index.add(3, bytearray(b"ijkl")) == [(Location(3, 0), Location(1, 0))]
@@ -0,0 +1,125 @@
+import pickle
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import cryptopals.language
+import cryptopals.multi_byte_xor
+import cryptopals.single_byte_xor
+import cryptopals.xor
+
+corpus = (
+    b"It was the best of times, it was the worst of times, it was the age of wisdom, it was "
+    b"the age of foolishness, it was the epoch of belief, it was the epoch of incredulity, "
+    b"it was the season of Light, it was the season of Darkness, it was the spring of hope, "
+    b"it was the winter of despair, we had everything before us, we had nothing before us, "
+    b"we were all going direct to Heaven, we were all going direct the other way."
+) * 4
+
+english = b"It was the age of the spring of hope and the winter of the season."
+garbage = bytes(range(0, 256, 4))
+
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_build(order: int) -> None:
+    model = cryptopals.language.build(corpus, order=order)
+
+    assert model.distance(english) < model.distance(garbage)
+    assert model.accepts(english)
+    assert not model.accepts(garbage)
+
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_distance_empty(order: int) -> None:
+    model = cryptopals.language.build(corpus, order=order)
+
+    assert model.distance(b"") == 0.0
+    assert model.accepts(b"")
+    assert cryptopals.multi_byte_xor.validate(b"", model=model)
+
+
+def test_single_byte_xor_distance_empty() -> None:
+    assert cryptopals.single_byte_xor.distance(b"") == 0.0
+    assert set(cryptopals.single_byte_xor.key_distances(b"")) == {0.0}
+
+
+def test_histogram_distances() -> None:
+    model = cryptopals.language.build(corpus, order=1)
+    assert isinstance(model, cryptopals.language.UnigramModel)
+    counts = Counter(english)
+
+    result = model.histogram_distances(counts, length=len(english))
+
+    assert result == pytest.approx(
+        [model.histogram_distance(counts, key=key, length=len(english)) for key in range(256)]
+    )
+    assert result[0] == pytest.approx(model.distance(english))
+
+
+def test_bigram_order() -> None:
+    model = cryptopals.language.build(corpus, order=2)
+
+    assert model.distance(b"the season") < model.distance(b"eht nosaes")
+
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_save_load(tmp_path: Path, order: int) -> None:
+    path = tmp_path / "model.bin"
+    model = cryptopals.language.build(corpus, order=order)
+
+    cryptopals.language.save(model, path)
+    result = cryptopals.language.load(path)
+
+    assert type(result) is type(model)
+    assert "tables" not in result.__dict__
+    assert result.max_distance == model.max_distance
+    assert result.distance(english) == pytest.approx(model.distance(english), rel=1e-6)
+
+
+def test_load_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "model.bin"
+    path.write_bytes(b"\x00" * 64)
+
+    with pytest.raises(ValueError):
+        cryptopals.language.load(path)
+
+
+def test_compile_corpus(tmp_path: Path) -> None:
+    corpus_path = tmp_path / "corpus.txt"
+    model_path = tmp_path / "model.bin"
+    corpus_path.write_bytes(corpus)
+
+    cryptopals.language.compile_corpus(corpus_path, model_path, order=1)
+    model = cryptopals.language.load(model_path)
+
+    ciphertext = cryptopals.xor.encrypt(english, key=b"\x42")
+    assert cryptopals.single_byte_xor.crack(ciphertext, model=model) == b"\x42"
+
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_single_byte_xor_crack(order: int) -> None:
+    model = cryptopals.language.build(corpus, order=order)
+    ciphertext = cryptopals.xor.encrypt(english, key=b"\x17")
+
+    result = cryptopals.single_byte_xor.crack(ciphertext, model=model)
+
+    assert result == b"\x17"
+
+
+def test_multi_byte_xor_validate() -> None:
+    model = cryptopals.language.build(corpus, order=2)
+
+    assert cryptopals.multi_byte_xor.validate(english, model=model)
+    assert not cryptopals.multi_byte_xor.validate(b"qzx xqz jjj vkq", model=model)
+
+
+def test_pickle_loaded(tmp_path: Path) -> None:
+    path = tmp_path / "model.bin"
+    cryptopals.language.save(cryptopals.language.build(corpus, order=1), path)
+    model = cryptopals.language.load(path)
+    expected = model.distance(english)
+
+    result = pickle.loads(pickle.dumps(model))
+
+    assert result.distance(english) == expected
@@ -1,8 +1,14 @@
-from typing import Sequence
+import io
+import itertools
+import math
+import string
+from typing import Literal, Sequence
 
 import pytest
 
 import cryptopals.multi_byte_xor
+import cryptopals.util
+import cryptopals.xor
 
 
 @pytest.mark.parametrize(
@@ -43,3 +49,176 @@ def test_transpose(input_: Sequence[bytes], expected: Sequence[bytes]) -> None:
     result = cryptopals.multi_byte_xor.transpose(input_)
 
     assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "bytes_0,bytes_1",
+    [
+        (b"", b""),
+        (b"\x00", b"\xff"),
+        (b"this is a test", b"wokka wokka!!!"),
+        (bytes(range(256)), bytes(range(255, -1, -1))),
+    ],
+)
+def test_hamming_distance(bytes_0: bytes, bytes_1: bytes) -> None:
+    result = cryptopals.multi_byte_xor.hamming_distance(bytes_0, bytes_1)
+
+    assert result == sum(
+        sum(cryptopals.multi_byte_xor.bits(byte_0 ^ byte_1))
+        for (byte_0, byte_1) in zip(bytes_0, bytes_1)
+    )
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 5])
+def test_evaluate_length(length: int) -> None:
+    ciphertext = bytes(range(7, 256, 11))
+    chunks = list(cryptopals.util.chunk_bytes(ciphertext, chunk_length=length))
+    pairs = list(itertools.combinations(chunks, 2))
+
+    result = cryptopals.multi_byte_xor.evaluate_length(ciphertext, length=length)
+
+    expected = sum(
+        cryptopals.multi_byte_xor.hamming_distance(bytes_0, bytes_1) for (bytes_0, bytes_1) in pairs
+    ) / (len(pairs) * length)
+    assert result == pytest.approx(expected)
+
+
+def test_evaluate_length_single_chunk() -> None:
+    result = cryptopals.multi_byte_xor.evaluate_length(b"abc", length=3)
+
+    assert result == math.inf
+
+
+plaintext = (
+    b"I'm back and I'm ringin' the bell. A rockin' on the mike while the fly girls yell. "
+    b"In ecstasy in the back of me. Well that's my DJ Deshay cuttin' all them Z's. "
+    b"Hittin' hard and the girlies goin' crazy. Vanilla's on the mike, man I'm not lazy."
+)
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_crack_parallel(pool: Literal["thread", "process"]) -> None:
+    key = b"ICE BABY"
+    ciphertext = cryptopals.xor.encrypt(plaintext, key=key)
+
+    result = cryptopals.multi_byte_xor.crack_parallel(
+        ciphertext,
+        key_lengths=range(2, 12),
+        pool=pool,
+        max_workers=2,
+    )
+
+    assert result[0] == cryptopals.multi_byte_xor.Candidate(key=key, confidence=1.0, valid=True)
+
+
+def test_crack_parallel_all_lengths() -> None:
+    ciphertext = cryptopals.xor.encrypt(plaintext, key=b"ICE BABY")
+
+    result = cryptopals.multi_byte_xor.crack_parallel(
+        ciphertext,
+        key_lengths=range(2, 12),
+        pool="thread",
+        stop_early=False,
+    )
+
+    assert sorted(len(candidate.key) for candidate in result) == list(range(2, 12))
+    assert result[0].key == b"ICE BABY"
+    assert [candidate.confidence for candidate in result[1:]] == sorted(
+        (candidate.confidence for candidate in result[1:]), reverse=True
+    )
+
+
+def test_crack_parallel_invalid() -> None:
+    ciphertext = bytes(range(256))
+
+    result = cryptopals.multi_byte_xor.crack_parallel(
+        ciphertext,
+        key_lengths=range(2, 5),
+        pool="thread",
+    )
+
+    assert len(result) == 3
+    assert not any(candidate.valid for candidate in result)
+
+
+@pytest.mark.parametrize("chunk_length", [1, 5, 64, 1000])
+def test_stream_cracker_evaluate_length(chunk_length: int) -> None:
+    ciphertext = bytes(range(7, 256, 11)) * 12
+    cracker = cryptopals.multi_byte_xor.StreamCracker(key_lengths=[2, 3, 4, 6])
+
+    for chunk in cryptopals.util.read_chunks(ciphertext, chunk_length=chunk_length):
+        cracker.update(chunk)
+
+    for length in [2, 3, 4, 6]:
+        assert cracker.evaluate_length(length) == pytest.approx(
+            cryptopals.multi_byte_xor.evaluate_length(ciphertext, length=length)
+        )
+
+
+def test_stream_cracker_sample() -> None:
+    cracker = cryptopals.multi_byte_xor.StreamCracker(
+        key_lengths=range(2, 12),
+        sample_length=100,
+        candidate_count=2,
+    )
+
+    cracker.update(cryptopals.xor.encrypt(plaintext, key=b"ICE BABY"))
+
+    assert len(cracker.sample) == 100
+    assert len(cracker.guess_key_length()) == 2
+    assert cracker.guess_key_length()[0] == 8
+
+
+@pytest.mark.parametrize("sample_length", [64, 1 << 20])
+@pytest.mark.parametrize("chunk_length", [7, 1 << 20])
+def test_crack_stream(chunk_length: int, sample_length: int) -> None:
+    key = b"ICE BABY"
+    ciphertext = cryptopals.xor.encrypt(plaintext, key=key)
+
+    result = cryptopals.multi_byte_xor.crack_stream(
+        io.BytesIO(ciphertext),
+        key_lengths=range(2, 12),
+        chunk_length=chunk_length,
+        sample_length=sample_length,
+    )
+
+    assert result == key
+
+
+@pytest.mark.parametrize(
+    "validator,plaintext,expected",
+    [
+        (cryptopals.multi_byte_xor.Validator(), b"", True),
+        (cryptopals.multi_byte_xor.Validator(), b"Hello, world!\n", True),
+        (cryptopals.multi_byte_xor.Validator(), b"Hello\x00", False),
+        (cryptopals.multi_byte_xor.Validator(charset=string.ascii_letters), b"Hello", True),
+        (cryptopals.multi_byte_xor.Validator(charset=string.ascii_letters), b"Hi you", False),
+        (cryptopals.multi_byte_xor.Validator(max_error_ratio=0.25), b"ab\x00d", True),
+        (cryptopals.multi_byte_xor.Validator(max_error_ratio=0.25), b"a\x00\x00d", False),
+        (cryptopals.multi_byte_xor.Validator(sample_length=2), b"\x00" + b"a" * 9, False),
+        (
+            cryptopals.multi_byte_xor.Validator(sample_length=2, max_error_ratio=0.1),
+            b"a" * 9 + b"\x00",
+            True,
+        ),
+        (
+            cryptopals.multi_byte_xor.Validator(sample_length=2, max_error_ratio=0.2),
+            b"\x00\x00" + b"a" * 8,
+            True,
+        ),
+        (
+            cryptopals.multi_byte_xor.Validator(sample_length=2, max_error_ratio=0.2),
+            b"\x00\x00" + b"a" * 7,
+            False,
+        ),
+    ],
+)
+def test_validate(
+    validator: cryptopals.multi_byte_xor.Validator, plaintext: bytes, expected: bool
+) -> None:
+    result = cryptopals.multi_byte_xor.validate(plaintext, validator=validator)
+
+    assert result == expected
+    assert result == (
+        validator.error_count(plaintext) <= validator.max_error_ratio * len(plaintext)
+    )
@@ -0,0 +1,138 @@
+import pickle
+from typing import Literal
+
+import pytest
+
+import cryptopals.aes
+import cryptopals.cbc
+import cryptopals.padding_oracle
+import cryptopals.pkcs7
+
+key = bytes(range(16))
+iv = bytes(range(16, 32))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.time = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.time
+
+    def sleep(self, duration: float) -> None:
+        self.sleeps.append(duration)
+        self.time += duration
+
+
+def make_probes() -> list[cryptopals.cbc.Probe]:
+    probes: list[cryptopals.cbc.Probe] = []
+    for length in [0, 1, 15, 16, 31, 47]:
+        padded = cryptopals.pkcs7.pad(b"x" * length, block_length=16)
+        ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=padded, iv=iv)
+        probes.append((iv, ciphertext))
+        for delta in [1, 2, 0x10]:
+            tweaked = bytearray(ciphertext)
+            if len(tweaked) > 16:
+                tweaked[-17] ^= delta
+                probes.append((iv, tweaked))
+            else:
+                probes.append((bytes([iv[0]]) + iv[1:-1] + bytes([iv[-1] ^ delta]), tweaked))
+    probes.append((iv, b""))
+    probes.append((iv, b"\x00" * 17))
+    return probes
+
+
+def reference_check(iv: bytes | bytearray, ciphertext: bytes | bytearray) -> bool:
+    if not ciphertext or len(ciphertext) % 16 != 0:
+        return False
+    padded = cryptopals.aes.decrypt_cbc(key=key, iv=iv, ciphertext=ciphertext)
+    return cryptopals.pkcs7.check_padding(padded)
+
+
+def test_check() -> None:
+    oracle = cryptopals.padding_oracle.PaddingOracle(key=key)
+    probes = make_probes()
+
+    results = [oracle.check(iv=iv, ciphertext=ciphertext) for (iv, ciphertext) in probes]
+
+    assert results == [reference_check(*probe) for probe in probes]
+    assert True in results
+    assert False in results
+    assert oracle.stats.calls == len(probes)
+    assert oracle.stats.probes == len(probes)
+
+
+def test_check_many() -> None:
+    oracle = cryptopals.padding_oracle.PaddingOracle(key=key)
+    probes = make_probes()
+
+    result = oracle.check_many(probes)
+
+    assert result == [reference_check(*probe) for probe in probes]
+    assert oracle.stats.calls == 1
+    assert oracle.stats.probes == len(probes)
+
+
+def test_latency() -> None:
+    clock = FakeClock()
+    oracle = cryptopals.padding_oracle.PaddingOracle(
+        key=key,
+        latency=0.5,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    oracle.check(iv=iv, ciphertext=b"\x00" * 16)
+    oracle.check(iv=iv, ciphertext=b"\x00" * 16)
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert oracle.stats.total_time == 1.0
+    assert oracle.stats.max_time == 0.5
+    assert oracle.stats.mean_time == 0.5
+
+
+def test_max_rate() -> None:
+    clock = FakeClock()
+    oracle = cryptopals.padding_oracle.PaddingOracle(
+        key=key,
+        max_rate=4,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    for _ in range(3):
+        oracle.check(iv=iv, ciphertext=b"\x00" * 16)
+    clock.time += 1
+    oracle.check(iv=iv, ciphertext=b"\x00" * 16)
+
+    assert clock.sleeps == [0.25, 0.25]
+    assert oracle.stats.calls == 4
+
+
+def test_pickle() -> None:
+    oracle = cryptopals.padding_oracle.PaddingOracle(key=key)
+    oracle.check(iv=iv, ciphertext=b"\x00" * 16)
+
+    result = pickle.loads(pickle.dumps(oracle))
+
+    assert result.check(iv=iv, ciphertext=b"\x00" * 16) == oracle.check(
+        iv=iv, ciphertext=b"\x00" * 16
+    )
+    assert result.stats.calls == 2
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_crack_parallel(pool: Literal["thread", "process"]) -> None:
+    plaintext = cryptopals.pkcs7.pad(b"Cooking MC's like a pound of bacon", block_length=16)
+    ciphertext = cryptopals.aes.encrypt_cbc(key=key, plaintext=plaintext, iv=iv)
+    oracle = cryptopals.padding_oracle.PaddingOracle(key=key)
+
+    result = cryptopals.cbc.crack_parallel(
+        oracle=oracle,
+        params=cryptopals.cbc.Params(block_length=16, iv=iv, ciphertext=ciphertext),
+        pool=pool,
+        max_workers=2,
+    )
+
+    assert result == plaintext
@@ -28,9 +28,38 @@ def test_pad_mod(bytes_: bytes, block_length: int, expected: bytes) -> None:
         (b"\x02", None),
         (b"1\x03\x02", None),
         (b"1\x02\x03", None),
+        (b"1\x00", None),
     ],
 )
 def test_unpad(padded: bytes, expected: bytes | None) -> None:
     result = cryptopals.pkcs7.unpad(padded)
 
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    "padded,expected",
+    [
+        (b"\x01", True),
+        (b"1\x02\x02", True),
+        (bytearray(b"1\x02\x02"), True),
+        (b"\x10" * 16, True),
+        (b"", False),
+        (b"\x00", False),
+        (b"1\x00", False),
+        (b"\x02", False),
+        (b"1\x03\x02", False),
+        (b"1\x02\x03", False),
+    ],
+)
+def test_check_padding(padded: bytes, expected: bool) -> None:
+    result = cryptopals.pkcs7.check_padding(padded)
+
+    assert result == expected
+    assert result == (cryptopals.pkcs7.unpad(bytes(padded)) is not None)
+
+
+def test_check_many() -> None:
+    result = cryptopals.pkcs7.check_many([b"\x01", b"\x00", b"ab\x02\x02", b"ab\x02"])
+
+    assert result == [True, False, True, False]
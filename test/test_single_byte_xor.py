@@ -0,0 +1,30 @@
+import pytest
+
+import cryptopals.single_byte_xor
+import cryptopals.xor
+
+
+@pytest.mark.parametrize(
+    "ciphertext",
+    [
+        b"a",
+        b"Cooking MC's like a pound of bacon",
+        b"\x00\xff\x80AZaz",
+        bytes(range(0, 256, 3)) * 2,
+    ],
+)
+def test_key_distances(ciphertext: bytes) -> None:
+    result = cryptopals.single_byte_xor.key_distances(ciphertext)
+
+    assert len(result) == 255
+    for key, key_distance in enumerate(result):
+        plaintext = cryptopals.xor.encrypt(ciphertext, key=bytes([key]))
+        assert key_distance == pytest.approx(cryptopals.single_byte_xor.distance(plaintext))
+
+
+def test_crack() -> None:
+    plaintext = b"Now that the party is jumping"
+
+    result = cryptopals.single_byte_xor.crack(cryptopals.xor.encrypt(plaintext, key=b"\x42"))
+
+    assert result == b"\x42"
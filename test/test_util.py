@@ -1,3 +1,4 @@
+import io
 from typing import Sequence
 
 import pytest
@@ -35,3 +36,79 @@ def test_nth_block(text: bytes, number: int, count: int | None, expected: bytes)
     result = cryptopals.util.nth_block(text, block_length=2, number=number, count=count)
 
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    "input_,chunk_length,expected",
+    [
+        (b"", 2, []),
+        (b"abcde", 2, [b"ab", b"cd", b"e"]),
+        (b"abcd", 2, [b"ab", b"cd"]),
+        (b"abcd", 8, [b"abcd"]),
+    ],
+)
+def test_read_chunks(input_: bytes, chunk_length: int, expected: Sequence[bytes]) -> None:
+    sources: list[cryptopals.util.Source] = [input_, memoryview(input_), io.BytesIO(input_)]
+
+    for source in sources:
+        result = cryptopals.util.read_chunks(source, chunk_length=chunk_length)
+
+        assert list(result) == expected
+
+
+@pytest.mark.parametrize(
+    "input_,block_length,partial,expected",
+    [
+        (b"", 2, False, []),
+        (b"abcde", 2, False, [b"ab", b"cd"]),
+        (b"abcde", 2, True, [b"ab", b"cd", b"e"]),
+        (b"abcd", 2, True, [b"ab", b"cd"]),
+        (bytearray(b"abc"), 4, True, [b"abc"]),
+    ],
+)
+def test_iter_blocks(
+    input_: bytes, block_length: int, partial: bool, expected: Sequence[bytes]
+) -> None:
+    result = cryptopals.util.iter_blocks(input_, block_length=block_length, partial=partial)
+
+    assert [bytes(block) for block in result] == expected
+
+
+def test_iter_blocks_no_copy() -> None:
+    data = bytearray(b"abcd")
+
+    (_, block_1) = cryptopals.util.iter_blocks(data, block_length=2)
+    data[3] = ord("x")
+
+    assert bytes(block_1) == b"cx"
+
+
+@pytest.mark.parametrize(
+    "input_,block_length,expected",
+    [
+        (b"", 2, b""),
+        (b"abcd", 2, b""),
+        (b"abcde", 2, b"e"),
+        (b"abc", 4, b"abc"),
+    ],
+)
+def test_remainder(input_: bytes, block_length: int, expected: bytes) -> None:
+    result = cryptopals.util.remainder(input_, block_length=block_length)
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("partial", [False, True])
+@pytest.mark.parametrize(
+    "length,offset",
+    [(1, 0), (2, 0), (2, 1), (3, 0), (3, 2), (5, 1), (5, 4)],
+)
+def test_column_view(length: int, offset: int, partial: bool) -> None:
+    data = b"abcdefghijklm"
+    rows = [data[start : start + length] for start in range(0, len(data), length)]
+    if not partial:
+        rows = [row for row in rows if len(row) == length]
+
+    result = cryptopals.util.column_view(data, length=length, offset=offset, partial=partial)
+
+    assert result == bytes(row[offset] for row in rows if offset < len(row))
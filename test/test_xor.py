@@ -26,3 +26,48 @@ class TestEncrypt:
         result = cryptopals.xor.encrypt(plaintext, key)
 
         assert result == b"\x10"
+
+
+class TestAdd:
+    def test_buffers(self) -> None:
+        result = cryptopals.xor.add(b"\x01\x02\x03", bytearray(b"\x10\x20\x30"))
+
+        assert result == b"\x11\x22\x33"
+
+    def test_memoryview(self) -> None:
+        result = cryptopals.xor.add(memoryview(b"\x01\x02\x03")[1:], b"\x01\x01")
+
+        assert result == b"\x03\x02"
+
+    def test_shortest(self) -> None:
+        result = cryptopals.xor.add(b"\x01\x02\x03", b"\x01")
+
+        assert result == b"\x00"
+
+    def test_iterable(self) -> None:
+        result = cryptopals.xor.add(b"\x01\x02\x03", iter([1, 1, 1, 1]))
+
+        assert result == b"\x00\x03\x02"
+
+    def test_same_as_iterable(self) -> None:
+        bytes_0 = bytes(range(256)) * 3
+        bytes_1 = bytes(reversed(range(256))) * 3
+
+        result = cryptopals.xor.add(bytes_0, bytes_1)
+
+        assert result == cryptopals.xor.add_iterable(bytes_0, bytes_1)
+
+
+def test_encrypt_same_as_iterable() -> None:
+    plaintext = bytes(range(256)) * 5
+    key = b"abcdefg"
+
+    result = cryptopals.xor.encrypt(plaintext, key)
+
+    assert result == cryptopals.xor.encrypt_iterable(plaintext, key)
+
+
+def test_encrypt_empty_key() -> None:
+    result = cryptopals.xor.encrypt(b"abc", b"")
+
+    assert result == b""